@@ -1 +1,10 @@
+from . import cli
 from . import models
+from . import wizard
+
+from .models.pg_extensions import ensure_pg_extensions
+
+
+def pre_init_hook(env):
+    """Tạo các extension PostgreSQL mà module cần"""
+    ensure_pg_extensions(env)
@@ -13,6 +13,7 @@
     "data": [
         "security/ir.model.access.csv",
         "data/sequence.xml",
+        "data/ir_cron.xml",
         "data/benefit_code_data.xml",
         "data/professional_title_data.xml",
         "data/medical_service_code_data.xml",
@@ -28,9 +29,13 @@
         "views/category_views.xml",
         "views/payment_rate_views.xml",
         "views/employee_views.xml",
+        "views/audit_log_views.xml",
+        "views/perf_stat_views.xml",
+        "wizard/catalog_import_wizard_views.xml",
         "menu/menu.xml",
         "demo/sync_his_demo.xml",
     ],
+    "pre_init_hook": "pre_init_hook",
     "installable": True,
     "auto_install": False,
     "application": True,
@@ -0,0 +1 @@
+from . import hic_populate
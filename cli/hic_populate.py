@@ -0,0 +1,52 @@
+"""Lệnh ``odoo-bin hic_populate`` sinh dữ liệu HIC khối lượng production
+
+Ví dụ::
+
+    odoo-bin hic_populate -c odoo.conf -d hic_load --hic-scale 2 --hic-seed 7
+"""
+
+import logging
+import optparse
+
+import odoo
+from odoo.cli import Command
+
+_logger = logging.getLogger(__name__)
+
+
+class HicPopulate(Command):
+    """Fill a database with seeded synthetic HIC catalog data"""
+
+    name = "hic_populate"
+
+    def run(self, cmdargs):
+        parser = odoo.tools.config.parser
+        parser.prog = f"odoo-bin {self.name}"
+        group = optparse.OptionGroup(parser, "HIC Populate Configuration")
+        group.add_option(
+            "--hic-scale",
+            dest="hic_scale",
+            type="float",
+            default=1.0,
+            help="Multiplier of the default volumes (20k facilities/staff, "
+            "5k payment rates...)",
+        )
+        group.add_option(
+            "--hic-seed",
+            dest="hic_seed",
+            type="int",
+            default=1,
+            help="Random seed, the same seed gives the same data",
+        )
+        parser.add_option_group(group)
+        opt = odoo.tools.config.parse_config(cmdargs, setup_logging=True)
+        dbname = odoo.tools.config["db_name"]
+        if not dbname:
+            parser.error("a database (-d) is required")
+        registry = odoo.modules.registry.Registry(dbname)
+        with registry.cursor() as cr:
+            env = odoo.api.Environment(cr, odoo.SUPERUSER_ID, {})
+            result = env["hic.data.generator"].generate(
+                scale=opt.hic_scale, seed=opt.hic_seed
+            )
+        _logger.info("HIC populate done: %s", result)
@@ -1,3 +1,6 @@
+from . import instrumentation
+from . import sync_mixin
+from . import audit_log
 from . import benefit_code
 from . import reference_level
 from . import department
@@ -6,3 +9,7 @@ from . import medical_facility
 from . import category
 from . import payment_rate
 from . import employee
+from . import claim_xml
+from . import coverage_engine
+from . import catalog_publisher
+from . import data_generator
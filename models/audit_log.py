@@ -0,0 +1,182 @@
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import str2bool
+
+# Khóa của danh sách bản ghi audit chờ ghi trong precommit của transaction
+PENDING_KEY = "hic.audit.pending"
+
+
+class AuditMixin(models.AbstractModel):
+    """Audit gọn thay cho tracking chatter, bật bằng ``hic.compact_audit``
+
+    Phải đứng trước ``mail.thread`` trong ``_inherit`` để context
+    ``mail_notrack``/``mail_create_nolog`` có hiệu lực với chatter.
+    """
+
+    _name = "hic.audit.mixin"
+    _description = "HIC Compact Audit Mixin"
+
+    @api.model
+    def _hic_audit_enabled(self):
+        # Giá trị không hợp lệ coi như tắt, không được làm hỏng việc ghi danh mục
+        return str2bool(
+            self.env["ir.config_parameter"].sudo().get_param("hic.compact_audit", "")
+            or False,
+            default=False,
+        )
+
+    @api.model
+    def _hic_audit_fields(self, fnames):
+        """Các trường được tracking trong ``fnames``"""
+        return [
+            fname
+            for fname in fnames
+            if fname in self._fields and getattr(self._fields[fname], "tracking", None)
+        ]
+
+    def _hic_audit_value(self, fname):
+        self.ensure_one()
+        field = self._fields[fname]
+        value = self[fname]
+        if field.type == "boolean":
+            return str(bool(value))
+        if field.relational:
+            return ",".join(str(record_id) for record_id in value.ids)
+        return "" if value is False or value is None else str(value)
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        if not self._hic_audit_enabled():
+            return super().create(vals_list)
+        records = super(
+            AuditMixin,
+            self.with_context(mail_create_nolog=True, mail_notrack=True),
+        ).create(vals_list)
+        self._hic_audit_append(
+            [
+                (record._name, record.id, "create", "", record.display_name)
+                for record in records
+            ]
+        )
+        return records.with_env(self.env)
+
+    def write(self, vals):
+        if not self._hic_audit_enabled():
+            return super().write(vals)
+        fnames = self._hic_audit_fields(vals)
+        old_values = {
+            record.id: [record._hic_audit_value(fname) for fname in fnames]
+            for record in self
+        }
+        res = super(AuditMixin, self.with_context(mail_notrack=True)).write(vals)
+        entries = []
+        for record in self:
+            for fname, old_value in zip(fnames, old_values[record.id]):
+                new_value = record._hic_audit_value(fname)
+                if new_value != old_value:
+                    entries.append((self._name, record.id, fname, old_value, new_value))
+        self._hic_audit_append(entries)
+        return res
+
+    def unlink(self):
+        if not self._hic_audit_enabled():
+            return super().unlink()
+        entries = [
+            (record._name, record.id, "unlink", record.display_name, "")
+            for record in self
+        ]
+        res = super().unlink()
+        self._hic_audit_append(entries)
+        return res
+
+    @api.model
+    def _hic_audit_append(self, entries):
+        """Đưa bản ghi audit vào hàng chờ, ghi một lần trước khi commit"""
+        if not entries:
+            return
+        precommit = self.env.cr.precommit
+        if PENDING_KEY not in precommit.data:
+            precommit.data[PENDING_KEY] = []
+            precommit.add(self.env["hic.audit.batch"].sudo()._flush_pending)
+        precommit.data[PENDING_KEY].extend(entries)
+
+
+class AuditBatch(models.Model):
+    _name = "hic.audit.batch"
+    _inherit = ["mail.thread"]
+    _description = "HIC Audit Batch"
+    _order = "id desc"
+
+    name = fields.Char(required=True, readonly=True)
+    model_names = fields.Char(readonly=True)
+    record_count = fields.Integer(readonly=True)
+    change_count = fields.Integer(readonly=True)
+    log_ids = fields.One2many("hic.audit.log", "batch_id", readonly=True)
+
+    @api.model
+    def _flush_pending(self):
+        """Ghi toàn bộ audit của transaction bằng một câu lệnh INSERT"""
+        entries = self.env.cr.precommit.data.pop(PENDING_KEY, [])
+        if not entries:
+            return
+        model_names = sorted({entry[0] for entry in entries})
+        record_count = len({(entry[0], entry[1]) for entry in entries})
+        batch = self.with_context(mail_create_nolog=True).create(
+            {
+                "name": _(
+                    "%(changes)s changes on %(records)s records",
+                    changes=len(entries),
+                    records=record_count,
+                ),
+                "model_names": ", ".join(model_names),
+                "record_count": record_count,
+                "change_count": len(entries),
+            }
+        )
+        columns = list(zip(*entries))
+        self.env.cr.execute(
+            """
+            INSERT INTO hic_audit_log
+                   (batch_id, model_name, res_id, field_name, old_value, new_value)
+            SELECT %s, *
+              FROM unnest(%s::varchar[], %s::int[], %s::varchar[],
+                          %s::text[], %s::text[])
+            """,
+            [batch.id, *(list(column) for column in columns)],
+        )
+        batch._message_log(
+            body=_(
+                "%(changes)s changes on %(records)s records of %(models)s",
+                changes=len(entries),
+                records=record_count,
+                models=batch.model_names,
+            )
+        )
+        # Precommit chạy sau lần flush cuối của transaction
+        self.env.flush_all()
+
+
+class AuditLog(models.Model):
+    """Nhật ký audit chỉ ghi thêm, mỗi dòng là một thay đổi của một trường"""
+
+    _name = "hic.audit.log"
+    _description = "HIC Audit Log"
+    _order = "id desc"
+    _log_access = False
+
+    batch_id = fields.Many2one(
+        "hic.audit.batch", required=True, index=True, ondelete="cascade"
+    )
+    model_name = fields.Char(required=True, index=True)
+    res_id = fields.Many2oneReference(
+        string="Record ID", model_field="model_name", index=True
+    )
+    field_name = fields.Char(required=True)
+    old_value = fields.Text()
+    new_value = fields.Text()
+
+    def write(self, vals):
+        raise UserError(_("Audit log entries cannot be modified."))
+
+    def unlink(self):
+        raise UserError(_("Audit log entries cannot be deleted."))
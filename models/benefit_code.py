@@ -1,9 +1,11 @@
-from odoo import fields, models
+from odoo import api, fields, models, tools
+
+from .instrumentation import instrument
 
 
 class HicBenefitCode(models.Model):
     _name = "hic.benefit.code"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["hic.audit.mixin", "mail.thread", "mail.activity.mixin"]
     _description = "Health Insurance Benefit Code"
     _order = "benefit_code"
     _rec_name = "benefit_code"
@@ -45,10 +47,99 @@ class HicBenefitCode(models.Model):
         ),
     ]
 
-    def name_get(self):
+    @api.depends("benefit_code", "benefit_rate")
+    def _compute_display_name(self):
         """Display name with benefit code and rate"""
-        result = []
         for record in self:
-            name = f"{record.benefit_code} - {record.benefit_rate}%"
-            result.append((record.id, name))
+            record.display_name = f"{record.benefit_code} - {record.benefit_rate}%"
+
+    @api.model_create_multi
+    @instrument
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    @instrument
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @tools.ormcache()
+    def _get_code_registry(self):
+        """Map of benefit code (as text) to record id for active codes"""
+        self.flush_model(["benefit_code", "active"])
+        self.env.cr.execute(
+            "SELECT benefit_code::varchar, id FROM hic_benefit_code WHERE active"
+        )
+        return dict(self.env.cr.fetchall())
+
+    @tools.ormcache()
+    def _get_benefit_table(self):
+        """Map benefit code -> (id, benefit rate, transport covered,
+        non-BHYT cost paid, payment condition applied) for active codes"""
+        self.flush_model(
+            [
+                "benefit_code",
+                "benefit_rate",
+                "is_transport_cost_covered",
+                "is_non_bhyt_cost_paid",
+                "is_payment_condition_applied",
+                "active",
+            ]
+        )
+        self.env.cr.execute(
+            """
+            SELECT benefit_code, id, benefit_rate,
+                   is_transport_cost_covered, is_non_bhyt_cost_paid,
+                   is_payment_condition_applied
+              FROM hic_benefit_code
+             WHERE active
+            """
+        )
+        return {
+            row[0]: (row[1], row[2], bool(row[3]), bool(row[4]), bool(row[5]))
+            for row in self.env.cr.fetchall()
+        }
+
+    @tools.ormcache()
+    def _get_benefit_array(self):
+        """Dense tuple indexed by benefit code, ``None`` for unknown codes"""
+        table = self._get_benefit_table()
+        array = [None] * (max(table, default=0) + 1)
+        for code, (record_id, rate, transport, non_bhyt, condition) in table.items():
+            array[code] = {
+                "benefit_code": code,
+                "benefit_code_id": record_id,
+                "benefit_rate": rate,
+                "is_transport_cost_covered": transport,
+                "is_non_bhyt_cost_paid": non_bhyt,
+                "is_payment_condition_applied": condition,
+            }
+        return tuple(array)
+
+    @api.model
+    def decode_card_numbers(self, card_numbers):
+        """Decode benefit code, rate and coverage flags from BHYT card numbers
+
+        The benefit code is the third character of the card number.
+
+        :param card_numbers: iterable of card numbers
+        :return: list aligned with ``card_numbers`` of dicts with
+            ``benefit_code``, ``benefit_code_id``, ``benefit_rate`` and the
+            coverage flags, ``False`` for invalid or unknown codes
+        """
+        array = self._get_benefit_array()
+        size = len(array)
+        result = []
+        for card_number in card_numbers:
+            digit = card_number[2:3] if card_number else ""
+            code = int(digit) if digit.isdigit() else 0
+            result.append(dict(array[code]) if code < size and array[code] else False)
         return result
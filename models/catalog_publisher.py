@@ -0,0 +1,70 @@
+import glob
+import os
+
+from odoo import api, models
+from odoo.tools import config
+
+from .catalog_snapshot import SNAPSHOT_MODE, CatalogSnapshot, write_snapshot
+
+# Số snapshot cũ giữ lại cho các worker còn đang mở
+KEEP_SNAPSHOTS = 3
+
+
+class CatalogSnapshotPublisher(models.AbstractModel):
+    _name = "hic.catalog.snapshot"
+    _description = "HIC Catalog Snapshot"
+
+    @api.model
+    def _snapshot_directory(self):
+        return self.env["ir.config_parameter"].sudo().get_param(
+            "hic.snapshot_dir"
+        ) or os.path.join(config.filestore(self.env.cr.dbname), "hic_snapshots")
+
+    @api.model
+    def _snapshot_mode(self):
+        """Quyền của file snapshot, dạng bát phân (vd. ``640``)"""
+        mode = self.env["ir.config_parameter"].sudo().get_param("hic.snapshot_mode")
+        return int(mode, 8) if mode else SNAPSHOT_MODE
+
+    @api.model
+    def publish_snapshot(self):
+        """Xuất snapshot danh mục mới nếu danh mục đã thay đổi
+
+        Các section không đổi được sao chép từ snapshot trước đó thay vì đọc
+        lại từ database.
+
+        :return: đường dẫn snapshot hiện hành
+        """
+        ICP = self.env["ir.config_parameter"].sudo()
+        directory = self._snapshot_directory()
+        previous_path = ICP.get_param("hic.catalog_snapshot")
+        previous = None
+        if previous_path and os.path.exists(previous_path):
+            previous = CatalogSnapshot(previous_path)
+        self.env.flush_all()
+        try:
+            path = write_snapshot(
+                self.env.cr, directory, previous, mode=self._snapshot_mode()
+            )
+        finally:
+            if previous:
+                previous.close()
+        if path != previous_path:
+            ICP.set_param("hic.catalog_snapshot", path)
+            self._prune_snapshots(directory, path)
+        return path
+
+    @api.model
+    def _prune_snapshots(self, directory, current_path):
+        snapshots = sorted(
+            glob.glob(os.path.join(directory, "catalog-*.snap")),
+            key=os.path.getmtime,
+            reverse=True,
+        )
+        for path in snapshots[KEEP_SNAPSHOTS:]:
+            if path != current_path:
+                os.remove(path)
+
+    @api.model
+    def _cron_publish_snapshot(self):
+        self.publish_snapshot()
@@ -0,0 +1,200 @@
+"""Snapshot danh mục HIC dạng file bất biến, có phiên bản, đọc bằng mmap
+
+File này không import ``odoo`` để các script/worker giám định ngoại tuyến có
+thể nạp trực tiếp (vd. qua ``importlib``) mà không cần khởi động Odoo.
+
+Định dạng file::
+
+    MAGIC | uint32 độ dài header | header JSON | section 1 | section 2 | ...
+
+Header chứa ``version``, ``fingerprints`` (dấu vân tay từng danh mục trong
+database) và vị trí ``offset``/``length`` của từng section. Mỗi section là JSON
+gọn ``{"columns": [...], "rows": [[...], ...]}``, chỉ được giải mã khi đọc.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+import tempfile
+
+MAGIC = b"HICSNAP1"
+HEADER_LENGTH = struct.Struct("<I")
+# Snapshot chứa mã BHXH, chứng chỉ hành nghề của nhân viên: chỉ chủ sở hữu và
+# nhóm của các worker ngoại tuyến được đọc
+SNAPSHOT_MODE = 0o640
+
+# Section -> (truy vấn dữ liệu, truy vấn dấu vân tay)
+SECTIONS = {
+    "categories": (
+        """SELECT id, category_type, code, name, benefit_code, active
+             FROM hic_category ORDER BY id""",
+        "SELECT count(*), max(write_date) FROM hic_category",
+    ),
+    "benefit_codes": (
+        """SELECT id, benefit_code, benefit_rate, is_payment_condition_applied,
+                  is_transport_cost_covered, is_non_bhyt_cost_paid, active
+             FROM hic_benefit_code ORDER BY id""",
+        "SELECT count(*), max(write_date) FROM hic_benefit_code",
+    ),
+    "reference_levels": (
+        """SELECT id, reference_code, level_number, start_date, end_date
+             FROM hic_reference_level ORDER BY start_date""",
+        "SELECT count(*), max(write_date) FROM hic_reference_level",
+    ),
+    "payment_rates": (
+        """SELECT id, code, medical_facility_id, technical_level_id,
+                  outpatient_rate, inpatient_rate, date_from, date_to
+             FROM hic_payment_rate ORDER BY id""",
+        "SELECT count(*), max(write_date) FROM hic_payment_rate",
+    ),
+    "facilities": (
+        "SELECT id, code, name FROM hic_medical_facility ORDER BY id",
+        "SELECT count(*), max(write_date) FROM hic_medical_facility",
+    ),
+    "departments": (
+        """SELECT id, department_source, bhyt_code, his_code, name, bhyt_name,
+                  active
+             FROM hr_department ORDER BY id""",
+        "SELECT count(*), max(write_date) FROM hr_department",
+    ),
+    "department_mappings": (
+        """SELECT bhyt_department_id, his_department_id
+             FROM bhyt_his_department_mapping
+         ORDER BY bhyt_department_id, his_department_id""",
+        """SELECT count(*),
+                  sum(hashtext(bhyt_department_id || ':' || his_department_id))
+             FROM bhyt_his_department_mapping""",
+    ),
+    "beds": (
+        """SELECT id, code, name, bed_type, bhyt_bed_id, department_id, price,
+                  active
+             FROM hic_hospital_bed ORDER BY id""",
+        "SELECT count(*), max(write_date) FROM hic_hospital_bed",
+    ),
+    "staff": (
+        """SELECT id, his_code, name, department_id, bhyt_code,
+                  bhyt_certificate_code, bhyt_certificate_date, bhyt_title_id,
+                  bhyt_service_id, active
+             FROM hr_employee ORDER BY id""",
+        "SELECT count(*), max(write_date) FROM hr_employee",
+    ),
+}
+
+
+def _dumps(value):
+    return json.dumps(value, separators=(",", ":"), default=str).encode()
+
+
+def compute_fingerprints(cr):
+    """Dấu vân tay hiện tại của từng danh mục (một truy vấn mỗi bảng)
+
+    :param cr: cursor DB-API (cursor Odoo hoặc psycopg2)
+    """
+    fingerprints = {}
+    for name, (_query, fingerprint_query) in SECTIONS.items():
+        cr.execute(fingerprint_query)
+        fingerprints[name] = ":".join(str(value) for value in cr.fetchone())
+    return fingerprints
+
+
+def compute_version(fingerprints):
+    return hashlib.sha1(_dumps(sorted(fingerprints.items()))).hexdigest()[:16]
+
+
+def read_section(cr, name):
+    """Dữ liệu một section đã mã hóa, đọc bằng một truy vấn"""
+    cr.execute(SECTIONS[name][0])
+    columns = [column[0] for column in cr.description]
+    return _dumps({"columns": columns, "rows": cr.fetchall()})
+
+
+def write_snapshot(cr, directory, previous=None, mode=SNAPSHOT_MODE):
+    """Ghi snapshot mới, chỉ đọc lại các danh mục đã thay đổi
+
+    :param previous: snapshot trước đó (``CatalogSnapshot``) để tái sử dụng
+        các section không đổi
+    :param mode: quyền truy cập của file snapshot
+    :return: đường dẫn file snapshot (không ghi lại nếu phiên bản không đổi)
+    """
+    fingerprints = compute_fingerprints(cr)
+    version = compute_version(fingerprints)
+    path = os.path.join(directory, f"catalog-{version}.snap")
+    if os.path.exists(path):
+        return path
+    sections = {}
+    for name in SECTIONS:
+        if previous and previous.fingerprints.get(name) == fingerprints[name]:
+            sections[name] = previous.raw_section(name)
+        else:
+            sections[name] = read_section(cr, name)
+    layout = {}
+    offset = 0
+    for name, data in sections.items():
+        layout[name] = {"offset": offset, "length": len(data)}
+        offset += len(data)
+    header = _dumps(
+        {"version": version, "fingerprints": fingerprints, "sections": layout}
+    )
+    os.makedirs(directory, exist_ok=True)
+    # Ghi file tạm rồi đổi tên để người đọc không thấy file dở dang
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "wb") as snapshot:
+        snapshot.write(MAGIC)
+        snapshot.write(HEADER_LENGTH.pack(len(header)))
+        snapshot.write(header)
+        for data in sections.values():
+            snapshot.write(data)
+    # mkstemp tạo file 0600, worker chạy bằng user khác cần đọc được snapshot
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+    return path
+
+
+class CatalogSnapshot:
+    """Snapshot danh mục mở bằng mmap, giải mã từng section khi cần"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as snapshot:
+            self._mmap = mmap.mmap(snapshot.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a HIC catalog snapshot")
+        start = len(MAGIC) + HEADER_LENGTH.size
+        (header_length,) = HEADER_LENGTH.unpack(self._mmap[len(MAGIC) : start])
+        header = json.loads(self._mmap[start : start + header_length])
+        self._data_offset = start + header_length
+        self.version = header["version"]
+        self.fingerprints = header["fingerprints"]
+        self._layout = header["sections"]
+        self._cache = {}
+
+    def raw_section(self, name):
+        section = self._layout[name]
+        start = self._data_offset + section["offset"]
+        return self._mmap[start : start + section["length"]]
+
+    def section(self, name):
+        """Các dòng của section dưới dạng list dict"""
+        if name not in self._cache:
+            data = json.loads(self.raw_section(name))
+            columns = data["columns"]
+            self._cache[name] = [dict(zip(columns, row)) for row in data["rows"]]
+        return self._cache[name]
+
+    def __getitem__(self, name):
+        return self.section(name)
+
+    def is_current(self, cr):
+        """Snapshot có khớp với database hiện tại không"""
+        return compute_version(compute_fingerprints(cr)) == self.version
+
+    def close(self):
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -2,13 +2,82 @@ import re
 
 import regex
 
-from odoo import _, api, fields, models
+from odoo import _, _lt, api, fields, models, tools
 from odoo.exceptions import ValidationError
 
+from .instrumentation import instrument
+from .pg_extensions import ensure_pg_extensions
+
+# Code format rules, compiled once per category type. A rule returns
+# ``(message, params)`` when the code is invalid; messages are lazy
+# translations (``_lt``) and may also use the category type name as
+# ``%(name)s``.
+BHYT_OBJECT_CODE_MESSAGE = _lt(
+    "BHYT object code must not exceed 2 characters and "
+    "must not contain numbers or special characters!"
+)
+KCB_OBJECT_CODE_MESSAGE = _lt(
+    "KCB object code must not exceed 4 characters and "
+    "must contain only numbers and special characters "
+    "(no letters and number '0')!"
+)
+# Only letters and spaces allowed
+BHYT_OBJECT_CODE_PATTERN = regex.compile(r"^[\p{L}\s]*$", regex.I)
+# Only numbers and special characters allowed (no letters)
+KCB_OBJECT_CODE_PATTERN = regex.compile(r"^[\d\s\-_\.\(\)\[\]]*$", regex.I)
+
+
+def _max_length_rule(max_length, message):
+    return lambda code: (message, {}) if len(code) > max_length else None
+
+
+def _pattern_rule(pattern, message):
+    return lambda code: None if pattern.match(code) else (message, {})
+
+
+def _digits_rule(message):
+    return lambda code: None if code.isdigit() else (message, {})
+
+
+def _range_rule(min_val, max_val):
+    # Runs after _digits_rule, the code is known to be numeric
+    message = _lt("%(name)s must be between %(min)s and %(max)s!")
+    params = {"min": min_val, "max": max_val}
+    return lambda code: None if min_val <= int(code) <= max_val else (message, params)
+
+
+def _not_zero_rule(message):
+    return lambda code: (message, {}) if code.strip() == "0" else None
+
+
+TWO_DIGIT_CODE_RULES = (
+    _digits_rule(_lt("Code must contain only numbers for this category type!")),
+    _max_length_rule(2, _lt("The code length is only up to 2 digits!")),
+)
+NUMERIC_CODE_RULES = (
+    _digits_rule(_lt("%(name)s must be a number!")),
+    _range_rule(1, 99),
+)
+CODE_RULES = {
+    "professional_title": TWO_DIGIT_CODE_RULES,
+    "medical_service_code": TWO_DIGIT_CODE_RULES,
+    "bhyt_object_code": (
+        _max_length_rule(2, BHYT_OBJECT_CODE_MESSAGE),
+        _pattern_rule(BHYT_OBJECT_CODE_PATTERN, BHYT_OBJECT_CODE_MESSAGE),
+    ),
+    "kcb_object_code": (
+        _max_length_rule(4, KCB_OBJECT_CODE_MESSAGE),
+        _pattern_rule(KCB_OBJECT_CODE_PATTERN, KCB_OBJECT_CODE_MESSAGE),
+        _not_zero_rule(KCB_OBJECT_CODE_MESSAGE),
+    ),
+    "discharge_type_code": NUMERIC_CODE_RULES,
+    "accident_code": NUMERIC_CODE_RULES,
+}
+
 
 class CommonCategory(models.Model):
     _name = "hic.category"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["hic.audit.mixin", "mail.thread", "mail.activity.mixin"]
     _description = "Common Category"
     _order = "category_type, code asc"
     _rec_name = "name"
@@ -16,12 +85,13 @@ class CommonCategory(models.Model):
     # Basic information
     code = fields.Char(
         required=True,
-        index=True,
+        index="trigram",
         tracking=True,
         help="Unique identifier code for the category",
     )
     name = fields.Char(
         required=True,
+        index="trigram",
         tracking=True,
         translate=True,
         help="Display name of the category",
@@ -51,25 +121,18 @@ class CommonCategory(models.Model):
     )
     active = fields.Boolean(default=True)
 
-    @api.constrains("code", "category_type")
-    def _check_code_format(self):
-        """Validate code format based on category type"""
-        for record in self:
-            if record.code and record.category_type:
-                # Chỉ validate số cho professional_title và medical_service_code
-                if record.category_type in [
-                    "professional_title",
-                    "medical_service_code",
-                ]:
-                    if not record.code.isdigit():
-                        raise ValidationError(
-                            _("Code must contain only numbers for this category type!")
-                        )
-                    # Kiểm tra độ dài phải đúng 2 chữ số
-                    if len(record.code) > 2:
-                        raise ValidationError(
-                            _("The code length is only up to 2 digits!")
-                        )
+    def _auto_init(self):
+        ensure_pg_extensions(self.env)
+        return super()._auto_init()
+
+    @api.model
+    def _normalize_code(self, category_type, code):
+        """Normalize a raw code the way it is cleaned on input"""
+        code = (code or "").strip()
+        # Chỉ giữ lại 2 chữ số đầu tiên cho professional_title và medical_service_code
+        if category_type in ("professional_title", "medical_service_code"):
+            code = re.sub(r"\D", "", code)[:2]
+        return code
 
     @api.onchange("code", "category_type")
     def _onchange_code(self):
@@ -77,13 +140,7 @@ class CommonCategory(models.Model):
         if self.code and self.category_type:
             # Chỉ validate số cho professional_title và medical_service_code
             if self.category_type in ["professional_title", "medical_service_code"]:
-                # Chỉ giữ lại các ký tự số
-                numeric_only = re.sub(r"\D", "", self.code)
-
-                # Giới hạn chỉ 2 chữ số đầu tiên
-                if len(numeric_only) > 2:
-                    numeric_only = numeric_only[:2]
-
+                numeric_only = self._normalize_code(self.category_type, self.code)
                 if numeric_only != self.code:
                     self.code = numeric_only
                     if len(self.code) > 2:
@@ -98,136 +155,184 @@ class CommonCategory(models.Model):
                         }
                     }
 
-    def name_get(self):
+    @api.depends("code", "name")
+    def _compute_display_name(self):
         """Custom display name with code"""
-        result = []
         for record in self:
-            name = f"[{record.code}] {record.name}"
-            result.append((record.id, name))
-        return result
+            record.display_name = f"[{record.code}] {record.name}"
 
     @api.constrains("code", "category_type")
+    @instrument
     def _check_category_code(self):
-        """Check category code validation based on type"""
-        for record in self:
-            if not (record.code and record.category_type):
-                continue
+        """Check format and duplicates of the whole batch, reporting every error"""
+        records = self.filtered(lambda r: r.code and r.category_type)
+        if not records:
+            return
+        category_names = self._get_category_names()
+        errors = []
+        for record in records:
+            message = self._get_code_violation(
+                record.category_type, record.code, category_names
+            )
+            if message:
+                errors.append(f"[{record.code}] {message}")
+        errors.extend(self._check_code_duplicate(records))
+        if errors:
+            raise ValidationError("\n".join(errors))
 
-            # Validate code format based on category type
-            self._validate_code_format(record)
-
-            # Check for duplicates
-            self._check_code_duplicate(record)
-
-    def _validate_code_format(self, record):
-        """Validate code format based on category type"""
-        if record.category_type == "bhyt_object_code":
-            self._check_bhyt_object_code(record)
-        elif record.category_type == "kcb_object_code":
-            self._check_kcb_object_code(record)
-        elif record.category_type in ("discharge_type_code", "accident_code"):
-            self._check_numeric_code(record)
-
-    def _check_length(self, code, max_length, error_message):
-        """Check if code length is within limit"""
-        if len(code) > max_length:
-            raise ValidationError(_(error_message))
-
-    def _check_text_pattern(self, code, pattern, error_message):
-        """Check if code matches the specified pattern"""
-        if not regex.match(pattern, code, regex.I):
-            raise ValidationError(_(error_message))
-
-    def _check_numeric_only(self, code, category_name):
-        """Check if code contains only digits"""
-        if not code.isdigit():
-            raise ValidationError(_("%(name)s must be a number!", name=category_name))
-
-    def _check_numeric_range(self, code, min_val, max_val, category_name):
-        """Check if numeric code is within specified range"""
-        code_int = int(code)
-        if not (min_val <= code_int <= max_val):
-            raise ValidationError(
-                _(
-                    "%(name)s must be between %(min)s and %(max)s!",
-                    name=category_name,
-                    min=min_val,
-                    max=max_val,
-                )
+    @api.model
+    def validate_codes(self, category_type, codes):
+        """Validate the format of many codes without raising
+
+        :param category_type: a ``category_type`` value
+        :param codes: iterable of codes
+        :return: list of ``(code, message)`` tuples, one per invalid code
+        """
+        rules = CODE_RULES.get(category_type)
+        if not rules:
+            return []
+        category_names = self._get_category_names()
+        violations = []
+        for code in codes:
+            message = self._get_code_violation(
+                category_type, code or "", category_names, rules
             )
+            if message:
+                violations.append((code, message))
+        return violations
+
+    @api.model
+    def _get_code_violation(self, category_type, code, category_names, rules=None):
+        """Translated message of the first rule ``code`` breaks, if any"""
+        for rule in rules or CODE_RULES.get(category_type, ()):
+            violation = rule(code)
+            if violation:
+                message, params = violation
+                # str() translates the lazy message in the language of self.env
+                return str(message) % dict(
+                    params, name=category_names.get(category_type)
+                )
+        return False
+
+    @api.model
+    def _get_category_names(self):
+        """Translated category type names, keyed by type"""
+        return {
+            category_type: _(label)
+            for category_type, label in self._fields["category_type"].selection
+        }
 
     def _get_category_name(self, record):
         """Get translated category type name"""
-        return _(
-            dict(record._fields["category_type"].selection).get(record.category_type)
-        )
+        return self._get_category_names().get(record.category_type)
 
-    def _check_bhyt_object_code(self, record):
-        """Validate BHYT object code format"""
-        error_msg = (
-            "BHYT object code must not exceed 2 characters and "
-            "must not contain numbers or special characters!"
-        )
-        self._check_length(record.code, 2, error_msg)
-        # Only letters and spaces allowed
-        self._check_text_pattern(record.code, r"^[\p{L}\s]*$", error_msg)
-
-    def _check_kcb_object_code(self, record):
-        """Validate KCB object code format"""
-        error_msg = (
-            "KCB object code must not exceed 4 characters and "
-            "must contain only numbers and special characters "
-            "(no letters and number '0')!"
-        )
-        self._check_length(record.code, 4, error_msg)
-        # Only numbers and special characters allowed (no letters)
-        self._check_text_pattern(record.code, r"^[\d\s\-_\.\(\)\[\]]*$", error_msg)
-        if record.code.strip() == "0":
-            raise ValidationError(_(error_msg))
-
-    def _check_numeric_code(self, record):
-        """Validate numeric codes (discharge_type_code, accident_code)"""
-        category_name = self._get_category_name(record)
-        self._check_numeric_only(record.code, category_name)
-        self._check_numeric_range(record.code, 1, 99, category_name)
-
-    def _check_code_duplicate(self, record):
-        """Check for duplicate codes"""
-        existing = self.search(
-            [
-                ("category_type", "=", record.category_type),
-                ("code", "=", record.code),
-                ("id", "!=", record.id),
-            ],
-            limit=1,
+    def _check_code_duplicate(self, records):
+        """Return an error message for every duplicated code in ``records``"""
+        records.flush_model(["code", "category_type", "active"])
+        self.env.cr.execute(
+            """
+            SELECT category_type, code
+              FROM hic_category
+             WHERE (active OR id IN %(ids)s)
+               AND (category_type, code) IN (
+                       SELECT category_type, code
+                         FROM hic_category
+                        WHERE id IN %(ids)s
+                   )
+          GROUP BY category_type, code
+            HAVING count(*) > 1
+          ORDER BY category_type, code
+            """,
+            {"ids": tuple(records.ids)},
         )
+        category_names = self._get_category_names()
+        return [
+            _(
+                "%(name)s with the code %(code)s already exists. "
+                "Please check again.",
+                name=category_names.get(category_type),
+                code=code,
+            )
+            for category_type, code in self.env.cr.fetchall()
+        ]
 
-        if existing:
-            category_name = self._get_category_name(record)
-            raise ValidationError(
-                _(
-                    "%(name)s with the code %(code)s already exists. "
-                    "Please check again.",
-                    name=category_name,
-                    code=record.code,
+    @api.model_create_multi
+    @instrument
+    def create(self, vals_list):
+        """Override create to customize log message based on category type"""
+        # Skip the default creation log and tracking messages, a single
+        # custom message per record is logged below in one batch
+        records = super(
+            CommonCategory,
+            self.with_context(mail_create_nolog=True, mail_notrack=True),
+        ).create(vals_list)
+        category_names = self._get_category_names()
+        bodies = {}
+        # The compact audit log already records the creation when enabled,
+        # bulk imports opt out with the standard mail context flags
+        if not (
+            self._hic_audit_enabled()
+            or self.env.context.get("mail_create_nolog")
+            or self.env.context.get("tracking_disable")
+        ):
+            for record in records.filtered("category_type"):
+                bodies[record.id] = _(
+                    "%(name)s has been created.",
+                    name=category_names[record.category_type],
                 )
-            )
+        if bodies:
+            records.browse(list(bodies))._message_log_batch(bodies=bodies)
+        self.env.registry.clear_cache()
+        return records.with_env(self.env)
+
+    @instrument
+    def write(self, vals):
+        res = super().write(vals)
+        if {"code", "category_type", "active"} & vals.keys():
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @tools.ormcache("category_type")
+    def _get_code_registry(self, category_type):
+        """Map of code to record id for the active codes of a category type
+
+        Benefit codes are served from ``hic.benefit.code`` under the
+        ``benefit_code`` type so callers can resolve every catalog code the
+        same way.
+        """
+        if category_type == "benefit_code":
+            return self.env["hic.benefit.code"]._get_code_registry()
+        self.flush_model(["code", "category_type", "active"])
+        self.env.cr.execute(
+            """
+            SELECT code, id
+              FROM hic_category
+             WHERE category_type = %s AND active
+            """,
+            [category_type],
+        )
+        return dict(self.env.cr.fetchall())
 
     @api.model
-    def create(self, vals):
-        """Override create to customize log message based on category type"""
-        record = super().create(vals)
-        # Custom log message based on category type
-        if record.category_type:
-            category_name = self._get_category_name(record)
-            # Store all existing messages before creating custom one
-            existing_messages = record.message_ids
-            # Remove all previous messages (including default tracking messages)
-            if existing_messages:
-                existing_messages.unlink()
-            # Create custom message
-            record.message_post(
-                body=_("%(name)s has been created.", name=category_name),
-                message_type="notification",
-            )
-        return record
+    def resolve_codes(self, category_type, codes):
+        """Resolve raw catalog codes to record ids in bulk
+
+        :param category_type: a ``category_type`` value or ``benefit_code``
+        :param codes: iterable of raw codes
+        :return: dict mapping each known code to its record id, unknown
+            codes are left out
+        """
+        registry = self._get_code_registry(category_type)
+        result = {}
+        for code in codes:
+            if code is None or code is False:
+                continue
+            record_id = registry.get(str(code).strip())
+            if record_id:
+                result[code] = record_id
+        return result
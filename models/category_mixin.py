@@ -14,9 +14,11 @@ class CategoryMixin(models.AbstractModel):
         ('code_uniq', 'unique(code)', 'Mã phải duy nhất!'),
     ]
     
-    def name_get(self):
+    @api.depends('code', 'name')
+    def _compute_display_name(self):
         """Hiển thị [Mã] Tên"""
-        return [(rec.id, f"[{rec.code}] {rec.name}") for rec in self]
+        for rec in self:
+            rec.display_name = f"[{rec.code}] {rec.name}"
     
     @api.model
     def name_search(self, name='', args=None, operator='ilike', limit=100):
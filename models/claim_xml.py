@@ -0,0 +1,241 @@
+import base64
+import binascii
+
+from lxml import etree
+
+from odoo import _, api, models
+from odoo.tools import split_every
+
+# Các trường mã trong hồ sơ XML cần đối chiếu với danh mục HIC. Một số trường
+# được đổi tên giữa QĐ 4210 và QĐ 130, mỗi loại mã liệt kê tên của cả hai chuẩn
+CLAIM_CODE_FIELDS = {
+    "XML1": {
+        "MA_CSKCB": "facility",
+        # QĐ 4210: MA_LYDO_VVIEN, QĐ 130: MA_DOITUONG_KCB
+        "MA_LYDO_VVIEN": "kcb_object_code",
+        "MA_DOITUONG_KCB": "kcb_object_code",
+        # QĐ 4210: TINH_TRANG_RV, QĐ 130: MA_LOAI_RV
+        "TINH_TRANG_RV": "discharge_type_code",
+        "MA_LOAI_RV": "discharge_type_code",
+        "MA_TAI_NAN": "accident_code",
+        "MA_KHOA": "department",
+    },
+    "XML2": {
+        "MA_KHOA": "department",
+        "MA_BAC_SI": "staff",
+    },
+    "XML3": {
+        "MA_KHOA": "department",
+        "MA_GIUONG": "bed",
+        "MA_BAC_SI": "staff",
+    },
+    "XML5": {
+        "NGUOI_THUC_HIEN": "staff",
+    },
+}
+
+# Số thẻ BHYT trong XML1: MA_THE (QĐ 4210), MA_THE_BHYT (QĐ 130)
+CARD_NUMBER_FIELDS = ("MA_THE", "MA_THE_BHYT")
+
+# Mã "không có" theo chuẩn, không cần đối chiếu
+EMPTY_CODES = {"", "0"}
+
+
+def _split_codes(value):
+    """Một trường có thể chứa nhiều mã ngăn cách bởi ``;``"""
+    return [code.strip() for code in (value or "").split(";") if code.strip()]
+
+
+def _file_content(file_element):
+    """Nội dung XML của một FILEHOSO (base64 hoặc nhúng trực tiếp)"""
+    content = file_element.find("NOIDUNGFILE")
+    if content is None:
+        return None
+    if len(content):
+        return content[0]
+    try:
+        data = base64.b64decode((content.text or "").strip(), validate=True)
+    except (binascii.Error, ValueError):
+        data = (content.text or "").strip().encode()
+    if not data:
+        return None
+    parser = etree.XMLParser(huge_tree=True, resolve_entities=False, no_network=True)
+    return etree.fromstring(data, parser=parser)
+
+
+def iter_claims(source):
+    """Đọc tuần tự các hồ sơ (HOSO) của một file giám định, bộ nhớ không đổi
+
+    :param source: đường dẫn hoặc file object của file XML tổng hợp
+    :return: iterator các dict ``{"ma_lk", "card_numbers", "codes"}`` với
+        ``card_numbers`` là danh sách ``(field, card_number)`` và ``codes``
+        là danh sách ``(file, field, kind, code)``
+    """
+    # File do cơ sở KCB gửi lên: không đọc entity ngoài và không truy cập mạng
+    for _event, element in etree.iterparse(
+        source,
+        events=("end",),
+        tag="HOSO",
+        huge_tree=True,
+        resolve_entities=False,
+        no_network=True,
+    ):
+        claim = {"ma_lk": False, "card_numbers": [], "codes": [], "errors": []}
+        for file_element in element.iter("FILEHOSO"):
+            file_type = (file_element.findtext("LOAIHOSO") or "").strip().upper()
+            try:
+                root = _file_content(file_element)
+            except etree.XMLSyntaxError as error:
+                claim["errors"].append(
+                    {
+                        "file": file_type,
+                        "field": "NOIDUNGFILE",
+                        "code": False,
+                        "message": str(error),
+                    }
+                )
+                continue
+            if root is None:
+                continue
+            if file_type == "XML1":
+                claim["ma_lk"] = root.findtext(".//MA_LK") or claim["ma_lk"]
+                for node in root.iter(*CARD_NUMBER_FIELDS):
+                    claim["card_numbers"].extend(
+                        (node.tag, card_number)
+                        for card_number in _split_codes(node.text)
+                    )
+            fields_to_check = CLAIM_CODE_FIELDS.get(file_type)
+            if not fields_to_check:
+                # Bảng không có trường mã cần đối chiếu (vd. XML4); iter()
+                # không có tag sẽ duyệt mọi phần tử
+                continue
+            for node in root.iter(*fields_to_check):
+                for code in _split_codes(node.text):
+                    if code not in EMPTY_CODES:
+                        claim["codes"].append(
+                            (file_type, node.tag, fields_to_check[node.tag], code)
+                        )
+        yield claim
+        # Giải phóng các phần tử đã xử lý
+        element.clear()
+        while element.getprevious() is not None:
+            del element.getparent()[0]
+
+
+class ClaimXml(models.AbstractModel):
+    _name = "hic.claim.xml"
+    _description = "Claim XML Validation"
+
+    @api.model
+    def iter_claim_reports(self, source, batch_size=500):
+        """Kiểm tra các hồ sơ của file XML giám định theo lô
+
+        Mã của mỗi lô ``batch_size`` hồ sơ được đối chiếu với danh mục HIC
+        bằng một truy vấn cho mỗi loại danh mục.
+
+        :return: iterator các dict ``{"ma_lk", "errors"}``, mỗi lỗi gồm
+            ``file``, ``field``, ``code`` và ``message``
+        """
+        for claims in split_every(batch_size, iter_claims(source)):
+            known = self._known_claim_codes(claims)
+            for claim in claims:
+                errors = list(claim["errors"])
+                for file_type, field, kind, code in claim["codes"]:
+                    if code not in known[kind]:
+                        errors.append(self._claim_code_error(file_type, field, code))
+                for field, card_number in claim["card_numbers"]:
+                    # Mã đối tượng (2 ký tự đầu) và mã quyền lợi (ký tự thứ 3)
+                    if (
+                        card_number[:2] not in known["bhyt_object_code"]
+                        or card_number[2:3] not in known["benefit_code"]
+                    ):
+                        errors.append(
+                            self._claim_code_error("XML1", field, card_number)
+                        )
+                yield {"ma_lk": claim["ma_lk"], "errors": errors}
+
+    @api.model
+    def validate_claim_file(self, source, batch_size=500):
+        """Kiểm tra toàn bộ file, chỉ giữ lại báo cáo của hồ sơ có lỗi
+
+        :return: dict ``{"claims", "invalid", "reports"}``
+        """
+        result = {"claims": 0, "invalid": 0, "reports": []}
+        for report in self.iter_claim_reports(source, batch_size=batch_size):
+            result["claims"] += 1
+            if report["errors"]:
+                result["invalid"] += 1
+                result["reports"].append(report)
+        return result
+
+    @api.model
+    def _claim_code_error(self, file_type, field, code):
+        return {
+            "file": file_type,
+            "field": field,
+            "code": code,
+            "message": _(
+                "%(file)s/%(field)s: code %(code)s not found in HIC catalogs",
+                file=file_type,
+                field=field,
+                code=code,
+            ),
+        }
+
+    @api.model
+    def _known_claim_codes(self, claims):
+        """Tập mã đã có trong danh mục cho từng loại mã của một lô hồ sơ"""
+        codes = {
+            "facility": set(),
+            "department": set(),
+            "bed": set(),
+            "staff": set(),
+            "kcb_object_code": set(),
+            "discharge_type_code": set(),
+            "accident_code": set(),
+            "bhyt_object_code": set(),
+            "benefit_code": set(),
+        }
+        for claim in claims:
+            for _file, _field, kind, code in claim["codes"]:
+                codes[kind].add(code)
+            for _field, card_number in claim["card_numbers"]:
+                codes["bhyt_object_code"].add(card_number[:2])
+                codes["benefit_code"].add(card_number[2:3])
+
+        Category = self.env["hic.category"]
+        known = {
+            kind: set(Category.resolve_codes(kind, codes[kind]))
+            for kind in (
+                "kcb_object_code",
+                "discharge_type_code",
+                "accident_code",
+                "bhyt_object_code",
+                "benefit_code",
+            )
+        }
+        known["facility"] = self._existing_codes(
+            "hic.medical.facility", "code", codes["facility"]
+        )
+        known["department"] = self._existing_codes(
+            "hr.department",
+            "bhyt_code",
+            codes["department"],
+            [("department_source", "=", "bhyt")],
+        )
+        known["bed"] = self._existing_codes(
+            "hic.hospital.bed", "code", codes["bed"], [("bed_type", "=", "bhyt")]
+        )
+        known["staff"] = self._existing_codes(
+            "hr.employee", "bhyt_certificate_code", codes["staff"]
+        )
+        return known
+
+    @api.model
+    def _existing_codes(self, model_name, field_name, codes, domain=None):
+        if not codes:
+            return set()
+        records = self.env[model_name].search_fetch(
+            (domain or []) + [(field_name, "in", list(codes))], [field_name]
+        )
+        return set(records.mapped(field_name))
@@ -0,0 +1,95 @@
+import logging
+
+from odoo import _, api, models
+from odoo.exceptions import UserError
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+    _logger.debug("numpy is not installed, the coverage engine is unavailable")
+
+LINE_SERVICE = "service"
+LINE_TRANSPORT = "transport"
+LINE_NON_BHYT = "non_bhyt"
+
+
+class CoverageEngine(models.AbstractModel):
+    _name = "hic.coverage.engine"
+    _description = "BHYT Coverage Calculation Engine"
+
+    @api.model
+    def compute_coverage(self, lines):
+        """Compute insurer and patient amounts for a batch of claim lines
+
+        Amounts are computed column-wise: the insurer pays
+        ``cost * payment rate * benefit rate``, transport lines only when the
+        benefit code covers transport and non-BHYT lines only when it pays
+        out-of-scope costs. The patient pays the rest.
+
+        :param lines: dict of equally sized columns: ``cost``, ``inpatient``,
+            ``medical_facility_id``, ``technical_level_id``, ``benefit_code``,
+            ``service_date`` and optionally ``line_type`` (``service``,
+            ``transport`` or ``non_bhyt``, default ``service``)
+        :return: dict of numpy arrays ``insurer_amount``, ``patient_amount``,
+            ``payment_rate``, ``benefit_rate`` and ``rate_found``
+        """
+        if np is None:
+            raise UserError(_("The coverage engine requires the numpy library."))
+        cost = np.asarray(lines["cost"], dtype=float)
+        size = len(cost)
+        inpatient = np.asarray(lines["inpatient"], dtype=bool)
+        benefit_codes = np.asarray(lines["benefit_code"], dtype=np.int64)
+        line_type = lines.get("line_type")
+        if line_type is None:
+            line_type = [LINE_SERVICE] * size
+        line_type = np.asarray(line_type)
+
+        # Payment rates from the interval index, one lookup per line
+        resolved = self.env["hic.payment.rate"].resolve_rates(
+            zip(
+                lines["medical_facility_id"],
+                lines["technical_level_id"],
+                lines["service_date"],
+                inpatient.tolist(),
+            )
+        )
+        rate_found = np.fromiter(
+            (bool(rate_id) for rate_id, _rate in resolved), bool, size
+        )
+        payment_rate = np.fromiter(
+            (rate or 0.0 for _rate_id, rate in resolved), float, size
+        )
+
+        # Benefit code columns gathered from a dense table indexed by code
+        table = self.env["hic.benefit.code"]._get_benefit_table()
+        length = max([0, *table, int(benefit_codes.max()) if size else 0]) + 1
+        rates = np.zeros(length)
+        transport = np.zeros(length, dtype=bool)
+        non_bhyt = np.zeros(length, dtype=bool)
+        for code, (_record_id, rate, is_transport, is_non_bhyt, _condition) in (
+            table.items()
+        ):
+            rates[code] = rate
+            transport[code] = is_transport
+            non_bhyt[code] = is_non_bhyt
+        codes = np.clip(benefit_codes, 0, length - 1)
+        benefit_rate = rates[codes]
+
+        covered = (
+            (line_type == LINE_SERVICE)
+            | ((line_type == LINE_TRANSPORT) & transport[codes])
+            | ((line_type == LINE_NON_BHYT) & non_bhyt[codes])
+        )
+        insurer_amount = np.where(
+            covered, np.round(cost * payment_rate / 100 * benefit_rate / 100, 2), 0.0
+        )
+        return {
+            "insurer_amount": insurer_amount,
+            "patient_amount": np.round(cost - insurer_amount, 2),
+            "payment_rate": payment_rate,
+            "benefit_rate": benefit_rate,
+            "rate_found": rate_found,
+        }
@@ -0,0 +1,468 @@
+import logging
+import random
+import string
+from datetime import date, timedelta
+from itertools import product
+
+from psycopg2.extras import execute_values
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+# Số bản ghi sinh ra ở ``scale=1``
+BASE_COUNTS = {
+    "facilities": 20000,
+    "payment_rates": 5000,
+    "his_departments": 200,
+    "bhyt_departments": 60,
+    "bhyt_beds": 400,
+    "his_beds": 4000,
+    "staff": 20000,
+}
+# Số mã của từng loại danh mục cần có (không nhân theo ``scale``)
+CATEGORY_COUNTS = {
+    "technical_level": 8,
+    "professional_title": 40,
+    "medical_service_code": 12,
+    "bhyt_object_code": 60,
+    "kcb_object_code": 40,
+    "discharge_type_code": 7,
+    "accident_code": 9,
+}
+BATCH_SIZE = 1000
+
+FACILITY_TYPES = [
+    ("Trạm Y tế xã", 50),
+    ("Phòng khám đa khoa", 20),
+    ("Trung tâm Y tế huyện", 15),
+    ("Bệnh viện đa khoa huyện", 8),
+    ("Bệnh viện đa khoa tỉnh", 4),
+    ("Bệnh viện chuyên khoa", 3),
+]
+SPECIALTIES = [
+    "Nội tổng hợp",
+    "Ngoại tổng hợp",
+    "Sản",
+    "Nhi",
+    "Hồi sức cấp cứu",
+    "Tim mạch",
+    "Thần kinh",
+    "Tiêu hóa",
+    "Hô hấp",
+    "Thận - Tiết niệu",
+    "Chấn thương chỉnh hình",
+    "Ung bướu",
+    "Truyền nhiễm",
+    "Da liễu",
+    "Mắt",
+    "Tai Mũi Họng",
+    "Răng Hàm Mặt",
+    "Phục hồi chức năng",
+    "Y học cổ truyền",
+    "Gây mê hồi sức",
+    "Chẩn đoán hình ảnh",
+    "Xét nghiệm",
+]
+FAMILY_NAMES = [
+    ("Nguyễn", 38),
+    ("Trần", 11),
+    ("Lê", 9),
+    ("Phạm", 7),
+    ("Hoàng", 5),
+    ("Huỳnh", 5),
+    ("Phan", 4),
+    ("Vũ", 4),
+    ("Võ", 4),
+    ("Đặng", 2),
+    ("Bùi", 2),
+    ("Đỗ", 2),
+    ("Hồ", 2),
+    ("Ngô", 2),
+    ("Dương", 1),
+    ("Lý", 1),
+]
+MIDDLE_NAMES = "Văn Thị Hữu Minh Thanh Ngọc Quốc Thu".split()
+GIVEN_NAMES = (
+    "An Bình Chi Dũng Giang Hà Hải Hạnh Hiếu Hoa Hùng Hương Khánh Lan "
+    "Linh Long Mai Nam Ngân Phong Phương Quân Sơn Tâm Thảo Trang Tuấn Yến"
+).split()
+# Tỉ lệ thanh toán trái tuyến thường gặp (ngoại trú, nội trú)
+RATE_PAIRS = [((0, 40), 30), ((0, 60), 25), ((0, 100), 25), ((100, 100), 20)]
+RATE_START = date(2015, 1, 1)
+# Mốc cố định (trong quá khứ) của ngày cấp chứng chỉ hành nghề, để cùng seed
+# sinh cùng dữ liệu ở mọi ngày chạy
+CERTIFICATE_END = date(2024, 12, 31)
+
+
+def _weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def _category_candidates(category_type):
+    """Các mã hợp lệ theo ``CODE_RULES`` của từng loại danh mục"""
+    if category_type == "technical_level":
+        return (f"CD_{index:02d}" for index in range(1, 100))
+    if category_type in ("professional_title", "medical_service_code"):
+        return (f"{index:02d}" for index in range(1, 100))
+    if category_type == "bhyt_object_code":
+        return ("".join(pair) for pair in product(string.ascii_uppercase, repeat=2))
+    if category_type == "kcb_object_code":
+        return (
+            f"{major}.{minor}" if minor else str(major)
+            for major, minor in product(range(1, 10), range(10))
+        )
+    return (str(index) for index in range(1, 100))
+
+
+class DataGenerator(models.AbstractModel):
+    """Sinh dữ liệu giả lập với khối lượng production cho benchmark/tải
+
+    Dữ liệu được sinh theo ``seed`` nên hai lần chạy trên cùng một database
+    cho cùng kết quả. Mã đã tồn tại được bỏ qua để có thể chạy trên database
+    đã có dữ liệu mẫu.
+    """
+
+    _name = "hic.data.generator"
+    _description = "HIC Synthetic Data Generator"
+
+    @api.model
+    def generate(self, scale=1.0, seed=1):
+        """Sinh toàn bộ danh mục HIC
+
+        :param scale: hệ số nhân số lượng bản ghi của ``BASE_COUNTS``
+        :param seed: seed của bộ sinh số ngẫu nhiên
+        :return: dict số bản ghi đã tạo theo từng loại
+        """
+        rng = random.Random(seed)
+        self = self.with_context(
+            tracking_disable=True,
+            mail_create_nolog=True,
+            mail_notrack=True,
+            active_test=False,
+        )
+        counts = {
+            name: max(int(count * scale), 1) for name, count in BASE_COUNTS.items()
+        }
+        result = {"categories": self._generate_categories()}
+        facility_ids = self._generate_facilities(rng, counts["facilities"])
+        result["facilities"] = len(facility_ids)
+        result["payment_rates"] = self._generate_payment_rates(
+            rng, facility_ids, counts["payment_rates"]
+        )
+        his_departments, bhyt_departments = self._generate_departments(
+            rng, counts["his_departments"], counts["bhyt_departments"]
+        )
+        result["departments"] = len(his_departments) + len(bhyt_departments)
+        result["beds"] = self._generate_beds(
+            rng,
+            his_departments,
+            bhyt_departments,
+            counts["his_beds"],
+            counts["bhyt_beds"],
+        )
+        result["staff"] = self._generate_staff(rng, his_departments, counts["staff"])
+        self.env.registry.clear_cache()
+        _logger.info("Generated HIC data: %s", result)
+        return result
+
+    @api.model
+    def _bulk_insert(self, table, columns, rows):
+        """Chèn nhiều dòng bằng ``INSERT ... VALUES`` theo trang
+
+        :return: danh sách id theo thứ tự ``rows``
+        """
+        self.env.flush_all()
+        now = fields.Datetime.now()
+        uid = self.env.uid
+        query = (
+            f'INSERT INTO "{table}" ({", ".join(columns)}, '
+            "create_uid, create_date, write_uid, write_date) VALUES %s RETURNING id"
+        )
+        ids = []
+        for batch in split_every(BATCH_SIZE, rows):
+            ids += [
+                row[0]
+                for row in execute_values(
+                    self.env.cr._obj,
+                    query,
+                    [(*row, uid, now, uid, now) for row in batch],
+                    page_size=BATCH_SIZE,
+                    fetch=True,
+                )
+            ]
+        return ids
+
+    @api.model
+    def _generate_categories(self):
+        Category = self.env["hic.category"]
+        category_names = Category._get_category_names()
+        existing = {
+            (category.category_type, category.code)
+            for category in Category.search_fetch([], ["category_type", "code"])
+        }
+        vals_list = []
+        for category_type, count in CATEGORY_COUNTS.items():
+            have = sum(1 for key in existing if key[0] == category_type)
+            codes = [
+                code
+                for code in _category_candidates(category_type)
+                if (category_type, code) not in existing
+            ][: max(count - have, 0)]
+            vals_list += [
+                {
+                    "category_type": category_type,
+                    "code": code,
+                    "name": f"{category_names[category_type]} {code}",
+                }
+                for code in codes
+            ]
+        Category.create(vals_list)
+        return len(vals_list)
+
+    @api.model
+    def _generate_facilities(self, rng, count):
+        self.env.cr.execute("SELECT code FROM hic_medical_facility")
+        existing = {code for (code,) in self.env.cr.fetchall()}
+        rows = []
+        # Mã CSKCB: mã tỉnh (2 số) + số thứ tự (3 số)
+        for province, number in product(range(1, 100), range(1, 1000)):
+            if len(rows) == count:
+                break
+            code = f"{province:02d}{number:03d}"
+            if code not in existing:
+                kind = _weighted(rng, FACILITY_TYPES)
+                rows.append((code, f"{kind} {province:02d}-{number:03d}"))
+        if len(rows) < count:
+            raise UserError(
+                _(
+                    "Only %(available)s medical facility codes are left, "
+                    "cannot generate %(count)s facilities. Use a smaller scale.",
+                    available=len(rows),
+                    count=count,
+                )
+            )
+        return self._bulk_insert("hic_medical_facility", ["code", "name"], rows)
+
+    @api.model
+    def _generate_payment_rates(self, rng, facility_ids, count):
+        """Các giai đoạn liền kề (ngày bắt đầu = ngày kết thúc trước + 1)
+
+        Giai đoạn cuối có thể không có ngày kết thúc, giống dữ liệu thực tế.
+        """
+        levels = self.env["hic.category"].search(
+            [("category_type", "=", "technical_level")]
+        )
+        if not facility_ids or not levels:
+            return 0
+        pairs = list(product(facility_ids, levels.ids))
+        rng.shuffle(pairs)
+        rows = []
+        for facility_id, level_id in pairs:
+            date_from = RATE_START + timedelta(days=rng.randrange(365))
+            for period in range(rng.randint(1, 4)):
+                if len(rows) == count:
+                    break
+                outpatient, inpatient = _weighted(rng, RATE_PAIRS)
+                is_last = rng.random() < 0.3
+                date_to = None
+                if not is_last:
+                    date_to = date_from + timedelta(days=rng.randint(180, 3 * 365))
+                rows.append(
+                    (
+                        f"TL{facility_id:06d}{level_id:03d}{period}",
+                        facility_id,
+                        level_id,
+                        outpatient,
+                        inpatient,
+                        date_from,
+                        date_to,
+                    )
+                )
+                if is_last:
+                    break
+                date_from = date_to + timedelta(days=1)
+            if len(rows) == count:
+                break
+        ids = self._bulk_insert(
+            "hic_payment_rate",
+            [
+                "code",
+                "medical_facility_id",
+                "technical_level_id",
+                "outpatient_rate",
+                "inpatient_rate",
+                "date_from",
+                "date_to",
+            ],
+            rows,
+        )
+        # Tính các trường lưu trữ bằng ORM sau khi chèn trực tiếp
+        PaymentRate = self.env["hic.payment.rate"]
+        rates = PaymentRate.browse(ids)
+        self.env.add_to_compute(PaymentRate._fields["search_key"], rates)
+        rates.flush_recordset()
+        return len(ids)
+
+    @api.model
+    def _generate_departments(self, rng, his_count, bhyt_count):
+        Department = self.env["hr.department"]
+        existing = Department.search_fetch([], ["his_code", "bhyt_code"])
+        his_codes = set(existing.mapped("his_code"))
+        bhyt_codes = set(existing.mapped("bhyt_code"))
+        his_vals = []
+        index = 0
+        while len(his_vals) < his_count:
+            index += 1
+            code = f"K{index:04d}"
+            if code not in his_codes:
+                specialty = rng.choice(SPECIALTIES)
+                his_vals.append(
+                    {
+                        "name": f"Khoa {specialty} {index}",
+                        "his_code": code,
+                        "department_source": "his",
+                        "patient_department": rng.random() < 0.8,
+                    }
+                )
+        his_departments = Department.browse()
+        for batch in split_every(BATCH_SIZE, his_vals):
+            his_departments |= Department.create(list(batch))
+
+        # Mỗi khoa BHYT ánh xạ 1-5 khoa HIS
+        bhyt_vals = []
+        index = 0
+        while len(bhyt_vals) < bhyt_count:
+            index += 1
+            code = f"B{index:04d}"
+            if code not in bhyt_codes:
+                specialty = rng.choice(SPECIALTIES)
+                mapped = rng.sample(
+                    his_departments.ids, min(rng.randint(1, 5), len(his_departments))
+                )
+                bhyt_vals.append(
+                    {
+                        "name": f"Khoa {specialty}",
+                        "bhyt_code": code,
+                        "bhyt_name": f"Khoa {specialty}",
+                        "department_source": "bhyt",
+                        "patient_department": True,
+                        "his_department_ids": [(6, 0, mapped)],
+                    }
+                )
+        bhyt_departments = Department.create(bhyt_vals)
+        return his_departments, bhyt_departments
+
+    @api.model
+    def _generate_beds(
+        self, rng, his_departments, bhyt_departments, his_count, bhyt_count
+    ):
+        self.env.cr.execute("SELECT code, bed_type FROM hic_hospital_bed")
+        existing = set(self.env.cr.fetchall())
+        columns = [
+            "code",
+            "name",
+            "bed_type",
+            "department_id",
+            "price",
+            "bhyt_bed_id",
+            "active",
+        ]
+
+        def bed_rows(bed_type, prefix, count, department_ids, bhyt_bed_ids):
+            rows = []
+            index = 0
+            while len(rows) < count:
+                index += 1
+                code = f"{prefix}{index:05d}"
+                if (code, bed_type) in existing:
+                    continue
+                price = rng.randrange(150, 700) * 1000
+                rows.append(
+                    (
+                        code,
+                        f"Giường {code}",
+                        bed_type,
+                        rng.choice(department_ids) if department_ids else None,
+                        price,
+                        rng.choice(bhyt_bed_ids) if bhyt_bed_ids else None,
+                        True,
+                    )
+                )
+            return rows
+
+        bhyt_bed_ids = self._bulk_insert(
+            "hic_hospital_bed",
+            columns,
+            bed_rows("bhyt", "GB", bhyt_count, bhyt_departments.ids, []),
+        )
+        his_bed_ids = self._bulk_insert(
+            "hic_hospital_bed",
+            columns,
+            bed_rows("his", "GH", his_count, his_departments.ids, bhyt_bed_ids),
+        )
+        return len(bhyt_bed_ids) + len(his_bed_ids)
+
+    @api.model
+    def _generate_staff(self, rng, departments, count):
+        Category = self.env["hic.category"]
+        titles = Category.search([("category_type", "=", "professional_title")]).ids
+        services = Category.search(
+            [("category_type", "=", "medical_service_code")]
+        ).ids
+        Employee = self.env["hr.employee"]
+        employees = Employee.search_fetch([], ["his_code", "bhyt_code"])
+        existing = set(employees.mapped("his_code"))
+        existing_bhyt = set(employees.mapped("bhyt_code"))
+        # Phân bố nhân viên lệch giữa các khoa như thực tế
+        department_ids = departments.ids
+        weights = [1 / (rank + 1) for rank in range(len(department_ids))]
+        created = 0
+        index = 0
+        while created < count:
+            vals_list = []
+            while len(vals_list) < min(BATCH_SIZE, count - created):
+                index += 1
+                code = f"NV{index:06d}"
+                # Mã BHYT là duy nhất, suy từ số thứ tự thay vì sinh ngẫu nhiên
+                bhyt_code = f"{index:010d}"
+                if code in existing or bhyt_code in existing_bhyt:
+                    continue
+                has_certificate = rng.random() < 0.9
+                vals_list.append(
+                    {
+                        "name": " ".join(
+                            (
+                                _weighted(rng, FAMILY_NAMES),
+                                rng.choice(MIDDLE_NAMES),
+                                rng.choice(GIVEN_NAMES),
+                            )
+                        ),
+                        "his_code": code,
+                        "department_id": (
+                            rng.choices(department_ids, weights)[0]
+                            if department_ids
+                            else False
+                        ),
+                        "bhyt_code": bhyt_code,
+                        "bhyt_certificate_code": (
+                            f"{index:06d}/BYT-CCHN" if has_certificate else False
+                        ),
+                        "bhyt_certificate_date": (
+                            CERTIFICATE_END
+                            - timedelta(days=rng.randrange(30, 30 * 365))
+                            if has_certificate
+                            else False
+                        ),
+                        "bhyt_title_id": rng.choice(titles) if titles else False,
+                        "bhyt_service_id": (
+                            rng.choice(services) if services else False
+                        ),
+                    }
+                )
+            Employee.create(vals_list)
+            created += len(vals_list)
+        return created
@@ -1,11 +1,24 @@
-from odoo import _, api, fields, models
+from collections import Counter
+
+from odoo import _, api, fields, models, tools
 from odoo.exceptions import ValidationError
 
+from .instrumentation import instrument
+from .pg_extensions import ensure_pg_extensions
+
 
 class HRDepartment(models.Model):
     """Extend hr.department để thêm BHYT và HIS fields"""
 
-    _inherit = "hr.department"
+    _inherit = ["hr.department", "hic.sync.mixin"]
+    _his_source_name = "departments"
+    _his_sync_key = "his_code"
+    _his_field_map = {
+        "code": "his_code",
+        "name": "name",
+        "ref": "his_ref",
+        "patient_department": "patient_department",
+    }
 
     # Phân loại nguồn
     department_source = fields.Selection(
@@ -20,11 +33,14 @@ class HRDepartment(models.Model):
     )
 
     # BHYT specific fields
-    bhyt_code = fields.Char("BHYT Code", index=True, tracking=True, size=10)
-    bhyt_name = fields.Char("BHYT Name", tracking=True, translate=True)
+    bhyt_code = fields.Char("BHYT Code", index="trigram", tracking=True, size=10)
+    bhyt_name = fields.Char(
+        "BHYT Name", index="trigram", tracking=True, translate=True
+    )
 
     # HIS specific fields
-    his_code = fields.Char("HIS Code", index=True, readonly=True, size=10)
+    his_code = fields.Char("HIS Code", index="trigram", readonly=True, size=10)
+    name = fields.Char(index="trigram")
 
     # Mapping relationship - Many2many cho phép 1 BHYT map nhiều HIS
     his_department_ids = fields.Many2many(
@@ -41,25 +57,37 @@ class HRDepartment(models.Model):
         ("his_code_uniq", "unique(his_code)", "HIS department code must be unique!"),
     ]
 
-    @api.model
-    def create(self, vals):
+    def _auto_init(self):
+        ensure_pg_extensions(self.env)
+        return super()._auto_init()
+
+    @api.model_create_multi
+    @instrument
+    def create(self, vals_list):
         """Override create method để xử lý khi tạo khoa BHYT mới"""
-        if vals.get("department_source") == "bhyt":
-            # Validate mã BHYT không trùng
-            if vals.get("bhyt_code"):
-                existing = self.search(
+        bhyt_vals_list = [
+            vals for vals in vals_list if vals.get("department_source") == "bhyt"
+        ]
+        # Validate mã BHYT không trùng, một truy vấn cho cả lô
+        codes = [vals["bhyt_code"] for vals in bhyt_vals_list if vals.get("bhyt_code")]
+        if codes:
+            duplicates = {code for code, count in Counter(codes).items() if count > 1}
+            duplicates.update(
+                self.search(
                     [
-                        ("bhyt_code", "=", vals["bhyt_code"]),
+                        ("bhyt_code", "in", codes),
                         ("department_source", "=", "bhyt"),
                     ]
+                ).mapped("bhyt_code")
+            )
+            if duplicates:
+                raise ValidationError(
+                    _("BHYT department code '%s' already exists!")
+                    % ", ".join(sorted(duplicates))
                 )
-                if existing:
-                    raise ValidationError(
-                        _("BHYT department code '%s' already exists!")
-                        % vals["bhyt_code"]
-                    )
 
-            # Set default values cho khoa BHYT
+        # Set default values cho khoa BHYT
+        for vals in bhyt_vals_list:
             vals.update(
                 {
                     "patient_department": True,
@@ -67,7 +95,80 @@ class HRDepartment(models.Model):
                 }
             )
 
-        return super().create(vals)
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    @instrument
+    def write(self, vals):
+        res = super().write(vals)
+        if {
+            "his_department_ids",
+            "bhyt_code",
+            "his_code",
+            "department_source",
+            "active",
+        } & vals.keys():
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @tools.ormcache()
+    def _get_his_bhyt_code_map(self):
+        """Map mã khoa HIS -> tuple mã khoa BHYT được ánh xạ"""
+        self.flush_model(["bhyt_code", "his_code", "active", "his_department_ids"])
+        self.env.cr.execute(
+            """
+            SELECT his.his_code, bhyt.bhyt_code
+              FROM bhyt_his_department_mapping mapping
+              JOIN hr_department bhyt ON bhyt.id = mapping.bhyt_department_id
+              JOIN hr_department his ON his.id = mapping.his_department_id
+             WHERE bhyt.active
+               AND bhyt.bhyt_code IS NOT NULL
+               AND his.his_code IS NOT NULL
+          ORDER BY his.his_code, bhyt.bhyt_code
+            """
+        )
+        code_map = {}
+        for his_code, bhyt_code in self.env.cr.fetchall():
+            code_map.setdefault(his_code, []).append(bhyt_code)
+        return {his_code: tuple(codes) for his_code, codes in code_map.items()}
+
+    @api.model
+    def translate_his_departments(self, his_codes):
+        """Chuyển mã khoa HIS sang mã khoa BHYT theo lô
+
+        :param his_codes: iterable mã khoa HIS
+        :return: dict gồm ``mapped`` (``{mã HIS: mã BHYT}``), ``unmapped``
+            (danh sách mã HIS chưa ánh xạ) và ``ambiguous``
+            (``{mã HIS: [mã BHYT...]}`` khi ánh xạ tới nhiều khoa BHYT)
+        """
+        code_map = self._get_his_bhyt_code_map()
+        mapped, unmapped, ambiguous = {}, [], {}
+        for his_code in dict.fromkeys(his_codes):
+            bhyt_codes = code_map.get(his_code)
+            if not bhyt_codes:
+                unmapped.append(his_code)
+            elif len(bhyt_codes) > 1:
+                ambiguous[his_code] = list(bhyt_codes)
+            else:
+                mapped[his_code] = bhyt_codes[0]
+        return {"mapped": mapped, "unmapped": unmapped, "ambiguous": ambiguous}
+
+    @api.model
+    def _his_sync_domain(self):
+        return [("department_source", "=", "his")]
+
+    @api.model
+    def _his_prepare_vals(self, rows):
+        vals_list = super()._his_prepare_vals(rows)
+        for vals in vals_list:
+            vals["department_source"] = "his"
+        return vals_list
 
     @api.model
     def default_get(self, fields_list):
@@ -85,9 +186,9 @@ class HRDepartment(models.Model):
 
         return defaults
 
-    def name_get(self):
-        """Custom display name với icon"""
-        result = []
+    @api.depends("department_source", "bhyt_code", "bhyt_name", "his_code", "name")
+    def _compute_display_name(self):
+        """Custom display name với icon, tính theo lô"""
         for record in self:
             if record.department_source == "bhyt" and record.bhyt_code:
                 name = f"🏥 [{record.bhyt_code}] {record.bhyt_name or record.name}"
@@ -95,10 +196,10 @@ class HRDepartment(models.Model):
                 name = f"💻 [HIS-{record.his_code}] {record.name}"
             else:
                 name = record.name
-            result.append((record.id, name))
-        return result
+            record.display_name = name
 
     @api.model
+    @instrument
     def _name_search(self, name, domain=None, operator="ilike", limit=None, order=None):
         """Enhanced search"""
         if name:
@@ -1,13 +1,35 @@
 from datetime import date
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 from odoo.exceptions import ValidationError
 
+from .instrumentation import instrument
+
+STAFF_INDEX_FIELDS = {
+    "his_code",
+    "bhyt_code",
+    "bhyt_certificate_date",
+    "bhyt_title_id",
+    "bhyt_service_id",
+    "active",
+}
+
 
 class MedicalStaff(models.Model):
-    _inherit = "hr.employee"
+    _inherit = ["hr.employee", "hic.sync.mixin"]
     _description = "Medical Staff"
     _order = "name asc"
+    _his_source_name = "staff"
+    _his_sync_key = "his_code"
+    _his_field_map = {
+        "code": "his_code",
+        "name": "name",
+        "ref": "his_ref",
+        "bhyt_code": "bhyt_code",
+        "certificate_code": "bhyt_certificate_code",
+        "certificate_date": "bhyt_certificate_date",
+        "certificate_place": "bhyt_certificate_place",
+    }
 
     # Mã code từ his
     his_code = fields.Char(string="HIS Code", required=True)
@@ -46,6 +68,7 @@ class MedicalStaff(models.Model):
     )
 
     @api.constrains("bhyt_code")
+    @instrument
     def _check_bhyt_code(self):
         """Validate social insurance code format"""
         for record in self:
@@ -58,6 +81,7 @@ class MedicalStaff(models.Model):
                     raise ValidationError(_("BHYT Code must contain only numbers."))
 
     @api.constrains("bhyt_certificate_date")
+    @instrument
     def _check_certificate_date(self):
         """Validate certificate issue date"""
         for record in self:
@@ -67,6 +91,17 @@ class MedicalStaff(models.Model):
                         _("Certificate issue date cannot be in the future.")
                     )
 
+    @api.model
+    def _his_prepare_vals(self, rows):
+        vals_list = super()._his_prepare_vals(rows)
+        department_ids = self._his_department_ids(rows)
+        for row, vals in zip(rows, vals_list):
+            if "department_code" in row:
+                vals["department_id"] = department_ids.get(
+                    row["department_code"], False
+                )
+        return vals_list
+
     _sql_constraints = [
         (
             "social_insurance_code_unique",
@@ -84,3 +119,116 @@ class MedicalStaff(models.Model):
             "HIS Code must be unique!",
         ),
     ]
+
+    @api.model
+    def _his_archive_domain(self):
+        # Nhân viên nhập tay không có trong nguồn HIS, chỉ lưu trữ bản ghi
+        # đã từng được đồng bộ
+        return super()._his_archive_domain() + [("his_sync_hash", "!=", False)]
+
+    @api.model_create_multi
+    @instrument
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    @instrument
+    def write(self, vals):
+        res = super().write(vals)
+        if STAFF_INDEX_FIELDS & vals.keys():
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @tools.ormcache()
+    def _get_staff_index(self):
+        """Compact index of active staff keyed by HIS code
+
+        Values are ``(employee_id, bhyt_code_valid, certificate_date,
+        title_code, service_code)``.
+        """
+        self.flush_model(list(STAFF_INDEX_FIELDS))
+        self.env["hic.category"].flush_model(["code"])
+        self.env.cr.execute(
+            """
+            SELECT employee.his_code, employee.id, employee.bhyt_code,
+                   employee.bhyt_certificate_date, title.code, service.code
+              FROM hr_employee employee
+         LEFT JOIN hic_category title ON title.id = employee.bhyt_title_id
+         LEFT JOIN hic_category service ON service.id = employee.bhyt_service_id
+             WHERE employee.active AND employee.his_code IS NOT NULL
+            """
+        )
+        index = {}
+        for row in self.env.cr.fetchall():
+            his_code, employee_id, bhyt_code, certificate_date = row[:4]
+            index[his_code] = (
+                employee_id,
+                bool(bhyt_code and len(bhyt_code) == 10 and bhyt_code.isdigit()),
+                certificate_date,
+                row[4],
+                row[5],
+            )
+        return index
+
+    @api.model
+    def check_staff_eligibility(self, lines):
+        """Check practitioners of a batch of claim lines
+
+        :param lines: iterable of dicts with ``his_code``, ``service_date`` and
+            optionally the expected ``title_code`` and ``service_code``
+        :return: list aligned with ``lines`` of dicts with ``employee_id``,
+            ``eligible`` and ``reasons``, a list of:
+            ``unknown_staff``, ``invalid_bhyt_code``, ``no_certificate``,
+            ``certificate_after_service``, ``no_title``, ``title_mismatch``,
+            ``no_service``, ``service_mismatch``
+        """
+        index = self._get_staff_index()
+        result = []
+        for line in lines:
+            staff = index.get(line.get("his_code"))
+            if not staff:
+                result.append(
+                    {
+                        "employee_id": False,
+                        "eligible": False,
+                        "reasons": ["unknown_staff"],
+                    }
+                )
+                continue
+            (
+                employee_id,
+                bhyt_code_valid,
+                certificate_date,
+                title_code,
+                service_code,
+            ) = staff
+            reasons = []
+            if not bhyt_code_valid:
+                reasons.append("invalid_bhyt_code")
+            service_date = fields.Date.to_date(line.get("service_date"))
+            if not certificate_date:
+                reasons.append("no_certificate")
+            elif service_date and certificate_date > service_date:
+                reasons.append("certificate_after_service")
+            if not title_code:
+                reasons.append("no_title")
+            elif line.get("title_code") and line["title_code"] != title_code:
+                reasons.append("title_mismatch")
+            if not service_code:
+                reasons.append("no_service")
+            elif line.get("service_code") and line["service_code"] != service_code:
+                reasons.append("service_mismatch")
+            result.append(
+                {
+                    "employee_id": employee_id,
+                    "eligible": not reasons,
+                    "reasons": reasons,
+                }
+            )
+        return result
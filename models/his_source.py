@@ -0,0 +1,205 @@
+"""Nguồn dữ liệu HIS cho engine đồng bộ ``hic.sync.mixin``
+
+Mỗi adapter trả về các bản ghi HIS dạng ``dict`` theo từng nguồn
+(``departments``, ``beds``, ``staff``...) dưới dạng iterator để engine xử lý
+theo lô mà không phải nạp toàn bộ dữ liệu vào bộ nhớ.
+
+Bản ghi có thể mang ``modified`` (mốc thay đổi, so sánh được dạng chuỗi,
+vd. ISO 8601) để đồng bộ delta và ``deleted`` để báo bản ghi đã bị xóa.
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from odoo.tools import split_every
+
+_logger = logging.getLogger(__name__)
+
+HIS_SOURCES = {}
+
+
+def register_his_source(kind):
+    """Đăng ký một adapter nguồn HIS theo tên"""
+
+    def decorator(cls):
+        HIS_SOURCES[kind] = cls
+        return cls
+
+    return decorator
+
+
+def fetch_concurrently(jobs, max_workers=4, chunk_size=1000, queue_size=8):
+    """Tải nhiều nguồn HIS đồng thời, trả về các lô trong luồng gọi
+
+    Mỗi nguồn chạy trong một luồng của pool (tối đa ``max_workers`` nguồn
+    cùng lúc). Hàng đợi giới hạn ``queue_size`` lô giữ bộ nhớ ổn định khi
+    việc ghi dữ liệu chậm hơn việc tải. Các luồng tải không được dùng
+    ``env``/cursor, mọi thao tác ghi diễn ra ở luồng gọi.
+
+    :param jobs: dict ``{tên: hàm không tham số trả về iterator bản ghi}``
+    :return: iterator các cặp ``(tên, lô bản ghi)``
+    """
+    chunks = queue.Queue(maxsize=queue_size)
+    stop = threading.Event()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(name, fetch):
+        try:
+            for chunk in split_every(chunk_size, fetch()):
+                if not put((name, chunk, None)):
+                    return
+            put((name, None, None))
+        except Exception as error:  # noqa: BLE001 - chuyển lỗi về luồng gọi
+            put((name, None, error))
+
+    with ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="his_fetch"
+    ) as executor:
+        for name, fetch in jobs.items():
+            executor.submit(produce, name, fetch)
+        pending = len(jobs)
+        try:
+            while pending:
+                name, chunk, error = chunks.get()
+                if error is not None:
+                    raise error
+                if chunk is None:
+                    pending -= 1
+                    continue
+                yield name, chunk
+        finally:
+            stop.set()
+
+
+class HisSource:
+    """Adapter cơ sở, các adapter cụ thể override ``fetch``"""
+
+    def __init__(self, env):
+        self.env = env
+
+    def fetch(self, source_name, since=None):
+        """Iterator các bản ghi HIS (dict) của một nguồn
+
+        :param since: watermark ``modified``, chỉ trả về bản ghi thay đổi sau
+            mốc này (``None`` để lấy toàn bộ)
+        """
+        raise NotImplementedError("Phải implement method fetch")
+
+    def fetch_keys(self, source_name, key):
+        """Iterator khóa của mọi bản ghi còn tồn tại trong nguồn"""
+        for row in self.fetch(source_name):
+            if not row.get("deleted"):
+                yield row.get(key)
+
+
+@register_his_source("json")
+class JsonDumpHisSource(HisSource):
+    """Đọc bản dump HIS từ thư mục cục bộ
+
+    Mỗi nguồn là một file ``<source>.jsonl`` (một bản ghi JSON mỗi dòng, đọc
+    tuần tự) hoặc ``<source>.json`` (một mảng JSON).
+    """
+
+    def __init__(self, env, path=None):
+        super().__init__(env)
+        self.path = path or env["ir.config_parameter"].sudo().get_param(
+            "hic.his_source_path", ""
+        )
+
+    def fetch(self, source_name, since=None):
+        for row in self._read(source_name):
+            if since is None or (row.get("modified") or "") > since:
+                yield row
+
+    def _read(self, source_name):
+        jsonl_path = os.path.join(self.path, f"{source_name}.jsonl")
+        if os.path.exists(jsonl_path):
+            with open(jsonl_path, encoding="utf-8") as dump:
+                for line in dump:
+                    if line.strip():
+                        yield json.loads(line)
+            return
+        json_path = os.path.join(self.path, f"{source_name}.json")
+        if not os.path.exists(json_path):
+            # Không coi thiếu file là nguồn rỗng, tránh lưu trữ toàn bộ danh mục
+            raise FileNotFoundError(
+                f"HIS dump for '{source_name}' not found: {jsonl_path} or {json_path}"
+            )
+        with open(json_path, encoding="utf-8") as dump:
+            yield from json.load(dump)
+
+
+@register_his_source("http")
+class HttpHisSource(HisSource):
+    """Đọc dữ liệu từ API HIS theo trang
+
+    ``GET <url>/<source>?page=<n>&page_size=<m>[&since=<watermark>]`` trả về
+    một mảng JSON; trang có ít hơn ``page_size`` bản ghi là trang cuối. Lỗi
+    kết nối, timeout, HTTP 429 và 5xx được thử lại với backoff lũy thừa.
+    """
+
+    def __init__(self, env, url=None, page_size=None, timeout=None,
+                 max_retries=None, backoff=None):
+        super().__init__(env)
+        ICP = env["ir.config_parameter"].sudo()
+        self.url = (url or ICP.get_param("hic.his_source_url", "")).rstrip("/")
+        self.page_size = int(
+            page_size or ICP.get_param("hic.his_source_page_size", 500)
+        )
+        self.timeout = float(timeout or ICP.get_param("hic.his_source_timeout", 30))
+        self.max_retries = int(
+            max_retries if max_retries is not None
+            else ICP.get_param("hic.his_source_max_retries", 3)
+        )
+        self.backoff = float(
+            backoff
+            if backoff is not None
+            else ICP.get_param("hic.his_source_backoff", 0.5)
+        )
+
+    def fetch(self, source_name, since=None):
+        page = 1
+        while True:
+            params = {"page": page, "page_size": self.page_size}
+            if since:
+                params["since"] = since
+            rows = self._get(f"{self.url}/{source_name}", params)
+            yield from rows
+            if len(rows) < self.page_size:
+                return
+            page += 1
+
+    def _get(self, url, params):
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = requests.get(url, params=params, timeout=self.timeout)
+                if response.status_code != 429 and response.status_code < 500:
+                    response.raise_for_status()
+                    return response.json()
+                error = requests.HTTPError(
+                    f"{response.status_code} for {response.url}", response=response
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                error = exc
+            if attempt == self.max_retries:
+                raise error
+            delay = self.backoff * 2 ** attempt
+            _logger.warning(
+                "HIS request %s failed (%s), retrying in %.1fs", url, error, delay
+            )
+            time.sleep(delay)
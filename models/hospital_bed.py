@@ -1,4 +1,6 @@
-from odoo import fields, models
+from odoo import api, fields, models, tools
+
+from .instrumentation import instrument
 
 HIC_HOSPITAL_BED = "hic.hospital.bed"
 
@@ -7,8 +9,17 @@ class HospitalBed(models.Model):
     """Hospital Bed Category / Danh mục Giường bệnh"""
 
     _name = HIC_HOSPITAL_BED
+    _inherit = ["hic.sync.mixin"]
     _description = "Hospital Bed"
     _rec_name = "name"
+    _his_source_name = "beds"
+    _his_sync_key = "code"
+    _his_field_map = {
+        "code": "code",
+        "name": "name",
+        "ref": "his_ref",
+        "price": "price",
+    }
 
     code = fields.Char(
         string="Bed Code",
@@ -42,6 +53,8 @@ class HospitalBed(models.Model):
         help="Department where this bed is located",
     )
 
+    active = fields.Boolean(default=True)
+
     price = fields.Float(tracking=True, help="Price per day for using this bed")
 
     # Mapping fields
@@ -68,3 +81,71 @@ class HospitalBed(models.Model):
             "Bed code must be unique within the same type (BHYT/HIS)!",
         ),
     ]
+
+    @api.model
+    def _his_sync_domain(self):
+        return [("bed_type", "=", "his")]
+
+    @api.model
+    def _his_prepare_vals(self, rows):
+        vals_list = super()._his_prepare_vals(rows)
+        department_ids = self._his_department_ids(rows)
+        for row, vals in zip(rows, vals_list):
+            vals["bed_type"] = "his"
+            if "department_code" in row:
+                vals["department_id"] = department_ids.get(
+                    row["department_code"], False
+                )
+        return vals_list
+
+    @api.model_create_multi
+    @instrument
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    @instrument
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @tools.ormcache()
+    def _get_his_bed_price_map(self):
+        """Map HIS bed code -> (BHYT bed id, BHYT daily price)"""
+        self.flush_model(["code", "bed_type", "active", "bhyt_bed_id", "price"])
+        self.env.cr.execute(
+            """
+            SELECT his.code, bhyt.id, bhyt.price
+              FROM hic_hospital_bed his
+              JOIN hic_hospital_bed bhyt ON bhyt.id = his.bhyt_bed_id
+             WHERE his.bed_type = 'his'
+               AND his.active
+               AND bhyt.active
+            """
+        )
+        return {
+            code: (bhyt_bed_id, price or 0.0)
+            for code, bhyt_bed_id, price in self.env.cr.fetchall()
+        }
+
+    @api.model
+    def resolve_bed_prices(self, stays):
+        """Resolve BHYT bed and billed amount for a batch of bed stays
+
+        :param stays: iterable of ``(his_bed_code, days)`` tuples
+        :return: list aligned with ``stays`` of ``(bhyt_bed_id, unit_price,
+            total)`` tuples, ``(False, 0.0, 0.0)`` for unmapped HIS beds
+        """
+        price_map = self._get_his_bed_price_map()
+        result = []
+        for his_bed_code, days in stays:
+            bhyt_bed_id, unit_price = price_map.get(his_bed_code, (False, 0.0))
+            result.append((bhyt_bed_id, unit_price, unit_price * (days or 0)))
+        return result
@@ -0,0 +1,183 @@
+"""Đo thời gian và số câu SQL của các đường nóng trong module HIC
+
+Các method được bọc bằng ``@instrument`` (constraint, ``create``/``write``,
+``name_search``, đồng bộ HIS...) ghi nhận số lần gọi, thời gian thực thi và
+số câu SQL. Thời gian của một method bao gồm cả các method được đo bên trong
+nó (vd. ``create`` bao gồm constraint).
+
+Bật bằng tùy chọn ``hic_instrumentation = True`` trong file cấu hình Odoo
+(hoặc ``set_enabled(True)`` trong shell). Khi tắt, mỗi lần gọi chỉ tốn thêm
+một phép kiểm tra biến toàn cục.
+
+Số liệu được cộng dồn trong bộ nhớ của từng process và ghi định kỳ (sau khi
+transaction commit, tối đa mỗi ``FLUSH_INTERVAL`` giây) vào ``hic.perf.stat``
+bằng một cursor riêng, đồng thời xuất mỗi method một dòng log JSON trên logger
+``<module>.models.instrumentation.stats``.
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+
+from odoo import _, api, fields, models
+from odoo.modules.registry import Registry
+from odoo.tools import config, str2bool
+
+_logger = logging.getLogger(__name__)
+_stats_logger = logging.getLogger(f"{__name__}.stats")
+
+ENABLED = str2bool(str(config.get("hic_instrumentation") or False), default=False)
+FLUSH_INTERVAL = 10.0
+POSTCOMMIT_KEY = "hic.instrumentation.flush"
+
+# method -> [số lần gọi, tổng thời gian, thời gian lớn nhất, số câu SQL]
+_pending = {}
+_lock = threading.Lock()
+_last_flush = 0.0
+
+
+def set_enabled(enabled):
+    """Bật/tắt đo hiệu năng cho process hiện tại"""
+    global ENABLED
+    ENABLED = bool(enabled)
+
+
+def instrument(method):
+    """Decorator đo số lần gọi, thời gian và số câu SQL của một method
+
+    Đặt ngay trên ``def``, bên dưới các decorator ``api``.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not ENABLED:
+            return method(self, *args, **kwargs)
+        cr = self.env.cr
+        queries = cr.sql_log_count
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _record(
+                cr,
+                f"{self._name}.{method.__name__}",
+                time.perf_counter() - start,
+                cr.sql_log_count - queries,
+            )
+
+    return wrapper
+
+
+def _record(cr, key, seconds, queries):
+    with _lock:
+        stat = _pending.setdefault(key, [0, 0.0, 0.0, 0])
+        stat[0] += 1
+        stat[1] += seconds
+        stat[2] = max(stat[2], seconds)
+        stat[3] += queries
+    if POSTCOMMIT_KEY not in cr.postcommit.data:
+        cr.postcommit.data[POSTCOMMIT_KEY] = True
+        cr.postcommit.add(functools.partial(flush_stats, cr.dbname))
+
+
+def flush_stats(dbname, force=False):
+    """Ghi số liệu đang chờ của process vào ``hic.perf.stat`` và log
+
+    Không bao giờ ném lỗi: việc đo hiệu năng không được làm hỏng nghiệp vụ.
+    """
+    global _last_flush
+    with _lock:
+        now = time.monotonic()
+        if not _pending or (not force and now - _last_flush < FLUSH_INTERVAL):
+            return
+        stats = dict(_pending)
+        _pending.clear()
+        _last_flush = now
+    for key, (calls, seconds, max_seconds, queries) in stats.items():
+        _stats_logger.info(
+            json.dumps(
+                {
+                    "method": key,
+                    "calls": calls,
+                    "seconds": round(seconds, 6),
+                    "max_seconds": round(max_seconds, 6),
+                    "queries": queries,
+                }
+            )
+        )
+    keys = list(stats)
+    model_names = [key.rsplit(".", 1)[0] for key in keys]
+    columns = list(zip(*stats.values()))
+    try:
+        with Registry(dbname).cursor() as cr:
+            cr.execute(
+                """
+                INSERT INTO hic_perf_stat AS stat
+                       (method, model_name, calls, total_time, max_time,
+                        query_count, last_call)
+                SELECT *, now() AT TIME ZONE 'UTC'
+                  FROM unnest(%s::varchar[], %s::varchar[], %s::int[],
+                              %s::float8[], %s::float8[], %s::int[])
+                    ON CONFLICT (method) DO UPDATE
+                   SET calls = stat.calls + EXCLUDED.calls,
+                       total_time = stat.total_time + EXCLUDED.total_time,
+                       max_time = GREATEST(stat.max_time, EXCLUDED.max_time),
+                       query_count = stat.query_count + EXCLUDED.query_count,
+                       last_call = EXCLUDED.last_call
+                """,
+                [keys, model_names, *(list(column) for column in columns)],
+            )
+    except Exception:
+        _logger.exception("Could not store HIC instrumentation statistics")
+
+
+class PerfStat(models.Model):
+    _name = "hic.perf.stat"
+    _description = "HIC Method Performance Statistics"
+    _order = "total_time desc"
+    _rec_name = "method"
+    _log_access = False
+
+    method = fields.Char(required=True, readonly=True)
+    model_name = fields.Char(readonly=True, index=True)
+    calls = fields.Integer(readonly=True)
+    total_time = fields.Float("Total Time (s)", readonly=True)
+    max_time = fields.Float("Max Time (s)", readonly=True, aggregator="max")
+    avg_time = fields.Float(
+        "Average Time (s)", compute="_compute_averages", aggregator=None
+    )
+    query_count = fields.Integer("SQL Queries", readonly=True)
+    avg_queries = fields.Float(
+        "Average SQL Queries", compute="_compute_averages", aggregator=None
+    )
+    last_call = fields.Datetime(readonly=True)
+
+    _sql_constraints = [
+        ("method_uniq", "unique(method)", "Statistics must be unique per method!"),
+    ]
+
+    @api.depends("calls", "total_time", "query_count")
+    def _compute_averages(self):
+        for stat in self:
+            stat.avg_time = stat.total_time / stat.calls if stat.calls else 0.0
+            stat.avg_queries = stat.query_count / stat.calls if stat.calls else 0.0
+
+    def action_refresh(self):
+        """Ghi ngay số liệu đang chờ của process hiện tại"""
+        flush_stats(self.env.cr.dbname, force=True)
+        return {"type": "ir.actions.client", "tag": "reload"}
+
+    def action_reset(self):
+        self.env.cr.execute("DELETE FROM hic_perf_stat")
+        self.env.invalidate_all()
+        return {
+            "type": "ir.actions.client",
+            "tag": "display_notification",
+            "params": {
+                "message": _("Performance statistics have been reset."),
+                "type": "success",
+                "next": {"type": "ir.actions.client", "tag": "reload"},
+            },
+        }
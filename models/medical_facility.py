@@ -1,5 +1,8 @@
 from odoo import api, fields, models
 
+from .instrumentation import instrument
+from .pg_extensions import ensure_pg_extensions
+
 
 class MedicalFacility(models.Model):
     _name = "hic.medical.facility"
@@ -8,26 +11,38 @@ class MedicalFacility(models.Model):
     _rec_name = "name"
 
     # Basic information
-    code = fields.Char(required=True, help="Medical facility identification code")
-    name = fields.Char(required=True, help="Full name of the medical facility")
+    code = fields.Char(
+        required=True,
+        index="trigram",
+        help="Medical facility identification code",
+    )
+    name = fields.Char(
+        required=True,
+        index="trigram",
+        help="Full name of the medical facility",
+    )
 
     # Constraints
     _sql_constraints = [
         ("code_unique", "UNIQUE(code)", "Medical facility code must be unique!"),
     ]
 
-    def name_get(self):
+    def _auto_init(self):
+        ensure_pg_extensions(self.env)
+        return super()._auto_init()
+
+    @api.depends("code", "name")
+    def _compute_display_name(self):
         """Custom display name"""
-        result = []
         for record in self:
-            name = f"[{record.code}] {record.name}"
-            result.append((record.id, name))
-        return result
+            record.display_name = f"[{record.code}] {record.name}"
 
     @api.model
+    @instrument
     def name_search(self, name="", args=None, operator="ilike", limit=100):
         """Custom search by code or name"""
         args = args or []
         if name:
             args = ["|", ("code", operator, name), ("name", operator, name)] + args
-        return self.search(args, limit=limit).name_get()
+        records = self.search_fetch(args, ["code", "name"], limit=limit)
+        return [(record.id, record.display_name) for record in records]
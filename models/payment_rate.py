@@ -1,6 +1,11 @@
-from odoo import _, api, fields, models
+from bisect import bisect_right
+
+from odoo import _, api, fields, models, tools
 from odoo.exceptions import ValidationError
 
+from .instrumentation import instrument
+from .pg_extensions import ensure_pg_extensions
+
 
 class PaymentRate(models.Model):
     _name = "hic.payment.rate"
@@ -9,7 +14,11 @@ class PaymentRate(models.Model):
     _rec_name = "code"
 
     # Basic information
-    code = fields.Char(required=True, help="payment rate identification code")
+    code = fields.Char(
+        required=True,
+        index="trigram",
+        help="payment rate identification code",
+    )
 
     # Relations with other tables
     medical_facility_id = fields.Many2one(
@@ -52,6 +61,14 @@ class PaymentRate(models.Model):
         string="To Date", help="End date of validity (leave empty for unlimited)"
     )
 
+    # Denormalized search key used by name_search
+    search_key = fields.Char(
+        compute="_compute_search_key",
+        store=True,
+        index="trigram",
+        help="Code, hospital code and name and technical level names",
+    )
+
     # Constraints
     _sql_constraints = [
         ("code_unique", "UNIQUE(code)", "Payment rate code must be unique!"),
@@ -65,84 +82,164 @@ class PaymentRate(models.Model):
             "CHECK(inpatient_rate >= 0 AND inpatient_rate <= 100)",
             "Inpatient rate must be between 0% and 100%!",
         ),
+        (
+            "date_check",
+            "CHECK(date_to IS NULL OR date_from <= date_to)",
+            "End date must be after start date!",
+        ),
+        # GiST-backed exclusion constraint, requires the btree_gist extension.
+        # Checked by PostgreSQL on every insert/update, with no Python
+        # constrains counterpart
+        (
+            "period_no_overlap",
+            "EXCLUDE USING gist ("
+            "medical_facility_id WITH =, "
+            "technical_level_id WITH =, "
+            "daterange(date_from, date_to, '[]') WITH &&)",
+            "Payment rate already exists for this hospital and technical level "
+            "in this time period!",
+        ),
     ]
 
+    def _auto_init(self):
+        ensure_pg_extensions(self.env)
+        return super()._auto_init()
+
+    @api.model_create_multi
+    @instrument
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
+    @instrument
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @api.depends(
+        "code",
+        "medical_facility_id.code",
+        "medical_facility_id.name",
+        "technical_level_id.name",
+    )
+    def _compute_search_key(self):
+        # Technical level names are translated, index them in every language
+        langs = [code for code, _name in self.env["res.lang"].get_installed()]
+        level_names = {}
+        for lang in langs:
+            for level in self.technical_level_id.with_context(lang=lang):
+                level_names.setdefault(level.id, []).append(level.name or "")
+        for record in self:
+            parts = [
+                record.code or "",
+                record.medical_facility_id.code or "",
+                record.medical_facility_id.name or "",
+            ]
+            names = level_names.get(record.technical_level_id.id, [])
+            parts.extend(dict.fromkeys(names))
+            record.search_key = " ".join(part for part in parts if part)
+
     @api.constrains("date_from", "date_to")
+    @instrument
     def _check_date_validity(self):
         """Check date validity"""
         for record in self:
             if record.date_to and record.date_from > record.date_to:
                 raise ValidationError(_("End date must be after start date!"))
 
-    @api.constrains("medical_facility_id", "technical_level_id", "date_from", "date_to")
-    def _check_overlapping_periods(self):
-        """Check for no overlapping periods for same hospital and technical level"""
-        for record in self:
-            domain = [
-                ("id", "!=", record.id),
-                ("medical_facility_id", "=", record.medical_facility_id.id),
-                ("technical_level_id", "=", record.technical_level_id.id),
-            ]
-
-            # Check overlap
-            if record.date_to:
-                domain.extend(
-                    [
-                        "|",
-                        "&",
-                        ("date_from", "<=", record.date_from),
-                        ("date_to", ">=", record.date_from),
-                        "&",
-                        ("date_from", "<=", record.date_to),
-                        ("date_to", ">=", record.date_to),
-                    ]
-                )
-            else:
-                domain.extend(
-                    [
-                        "|",
-                        ("date_to", "=", False),
-                        ("date_to", ">=", record.date_from),
-                    ]
-                )
-
-            overlapping = self.search(domain)
-            if overlapping:
-                hospital_name = record.medical_facility_id.name
-                tech_level_name = record.technical_level_id.name
-                raise ValidationError(
-                    _(
-                        'Payment rate already exists for hospital "%(hospital)s" '
-                        'and technical level "%(tech_level)s" in this time period!'
-                    )
-                    % {
-                        "hospital": hospital_name,
-                        "tech_level": tech_level_name,
-                    }
-                )
-
-    def name_get(self):
-        """Custom display name"""
-        result = []
+    @api.depends("code", "medical_facility_id.name", "technical_level_id.name")
+    def _compute_display_name(self):
+        """Custom display name with hospital and technical level"""
         for record in self:
             hospital_name = record.medical_facility_id.name
             tech_level_name = record.technical_level_id.name
-            name = f"[{record.code}] {hospital_name} - {tech_level_name}"
-            result.append((record.id, name))
-        return result
+            record.display_name = (
+                f"[{record.code}] {hospital_name} - {tech_level_name}"
+            )
 
     @api.model
+    @instrument
     def name_search(self, name="", args=None, operator="ilike", limit=100):
         """Custom search by code, hospital name or technical level"""
         args = args or []
         if name:
-            args = [
-                "|",
-                "|",
-                "|",
-                ("code", operator, name),
-                ("medical_facility_id.name", operator, name),
-                ("medical_facility_id.code", operator, name),
-                ("technical_level_id.name", operator, name),
-            ] + args
-        return self.search(args, limit=limit).name_get()
+            # search_key gộp nhiều trường, chỉ có nghĩa với tìm kiếm chuỗi con
+            if operator in ("ilike", "like"):
+                args = [("search_key", operator, name)] + args
+            else:
+                args = [("code", operator, name)] + args
+        records = self.search_fetch(
+            args, ["code", "medical_facility_id", "technical_level_id"], limit=limit
+        )
+        return [(record.id, record.display_name) for record in records]
+
+    @tools.ormcache()
+    def _get_rate_index(self):
+        """Interval index of all rates keyed by (facility, technical level).
+
+        Each key maps to ``(starts, periods)`` sorted by ``date_from`` so that
+        a service date can be located with a binary search.
+        """
+        self.flush_model(
+            [
+                "medical_facility_id",
+                "technical_level_id",
+                "date_from",
+                "date_to",
+                "outpatient_rate",
+                "inpatient_rate",
+            ]
+        )
+        self.env.cr.execute(
+            """
+            SELECT id, medical_facility_id, technical_level_id,
+                   date_from, date_to, outpatient_rate, inpatient_rate
+              FROM hic_payment_rate
+          ORDER BY medical_facility_id, technical_level_id, date_from
+            """
+        )
+        index = {}
+        for row in self.env.cr.fetchall():
+            rate_id, facility_id, level_id, date_from, date_to = row[:5]
+            starts, periods = index.setdefault((facility_id, level_id), ([], []))
+            starts.append(date_from)
+            periods.append((rate_id, date_to, row[5] or 0.0, row[6] or 0.0))
+        return {
+            key: (tuple(starts), tuple(periods))
+            for key, (starts, periods) in index.items()
+        }
+
+    @api.model
+    def resolve_rates(self, requests):
+        """Resolve the applicable rate for a batch of claim lines
+
+        :param requests: iterable of ``(medical_facility_id, technical_level_id,
+            service_date, is_inpatient)`` tuples
+        :return: list aligned with ``requests`` of ``(rate_id, rate)`` tuples,
+            ``(False, False)`` when no rate applies on the service date
+        """
+        index = self._get_rate_index()
+        result = []
+        for facility_id, level_id, service_date, is_inpatient in requests:
+            match = (False, False)
+            entry = index.get((facility_id, level_id))
+            if entry and service_date:
+                service_date = fields.Date.to_date(service_date)
+                starts, periods = entry
+                pos = bisect_right(starts, service_date) - 1
+                if pos >= 0:
+                    rate_id, date_to, outpatient_rate, inpatient_rate = periods[pos]
+                    if not date_to or service_date <= date_to:
+                        match = (
+                            rate_id,
+                            inpatient_rate if is_inpatient else outpatient_rate,
+                        )
+            result.append(match)
+        return result
@@ -0,0 +1,32 @@
+import logging
+
+from odoo.modules.db import has_trigram
+
+_logger = logging.getLogger(__name__)
+
+# Extension cần dùng -> hậu quả khi không tạo được
+PG_EXTENSIONS = {
+    "pg_trgm": "catalog search will not use trigram indexes",
+    "unaccent": "catalog search will not ignore accents",
+    "btree_gist": "overlapping payment rate periods will not be rejected",
+}
+
+
+def ensure_pg_extensions(env):
+    """Tạo các extension PostgreSQL của module nếu chưa có
+
+    Gọi khi cài mới (``pre_init_hook``) và trong ``_auto_init`` của các model
+    cần đến extension (index trigram, ràng buộc EXCLUDE) để database nâng cấp
+    từ phiên bản cũ cũng có extension trước khi Odoo tạo index/ràng buộc.
+    """
+    for extension, consequence in PG_EXTENSIONS.items():
+        try:
+            with env.cr.savepoint():
+                env.cr.execute(f"CREATE EXTENSION IF NOT EXISTS {extension}")
+        except Exception:  # noqa: BLE001
+            _logger.warning(
+                "Could not create PostgreSQL extension %s, %s", extension, consequence
+            )
+    # Registry được khởi tạo trước khi extension tồn tại, cập nhật để tạo
+    # index trigram ngay trong lần cài đặt/nâng cấp này
+    env.registry.has_trigram = has_trigram(env.cr)
@@ -1,12 +1,15 @@
+from bisect import bisect_right
 from datetime import date, datetime
 
-from odoo import _, api, fields, models
+from odoo import _, api, fields, models, tools
 from odoo.exceptions import ValidationError
 
+from .instrumentation import instrument
+
 
 class ReferenceLevel(models.Model):
     _name = "hic.reference.level"
-    _inherit = ["mail.thread", "mail.activity.mixin"]
+    _inherit = ["hic.audit.mixin", "mail.thread", "mail.activity.mixin"]
     _description = "Reference Level"
     _order = "end_date desc"
     _rec_name = "reference_code"
@@ -39,12 +42,14 @@ class ReferenceLevel(models.Model):
     check_edit = fields.Boolean()
 
     @api.constrains("level_number")
+    @instrument
     def _check_level_number(self):
         for record in self:
             if record.level_number <= 0:
                 raise ValidationError(_("Level number must be greater than 0!"))
 
     @api.constrains("start_date", "end_date")
+    @instrument
     def _check_overlapping_dates(self):
         """Check that no overlapping time periods are allowed"""
         for record in self:
@@ -86,20 +91,74 @@ class ReferenceLevel(models.Model):
                         % overlapping_records.reference_code
                     )
 
+    @api.model_create_multi
+    @instrument
+    def create(self, vals_list):
+        """Override create to generate reference codes"""
+        new_vals = [
+            vals
+            for vals in vals_list
+            if vals.get("reference_code", _("New")) == _("New")
+        ]
+        codes = self._reserve_reference_codes(len(new_vals))
+        for vals, code in zip(new_vals, codes):
+            vals["reference_code"] = code or _("New")
+        today = date.today()
+        for vals in vals_list:
+            start_date = fields.Date.to_date(vals.get("start_date"))
+            if start_date and today >= start_date:
+                vals["check_edit"] = True
+        records = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return records
+
     @api.model
-    def create(self, vals):
-        """Override create to generate reference code"""
-        if vals.get("reference_code", _("New")) == _("New"):
-            vals["reference_code"] = self.env["ir.sequence"].next_by_code(
-                "hic.reference.level"
-            ) or _("New")
-        if (
-            vals.get("start_date")
-            and date.today() >= datetime.strptime(vals["start_date"], "%Y-%m-%d").date()
-        ):
-            vals["check_edit"] = True
-        return super().create(vals)
+    def _reserve_reference_codes(self, count):
+        """Reserve ``count`` reference codes from the sequence in one block"""
+        if not count:
+            return []
+        sequence = (
+            self.env["ir.sequence"]
+            .sudo()
+            .search(
+                [
+                    ("code", "=", "hic.reference.level"),
+                    ("company_id", "in", [self.env.company.id, False]),
+                ],
+                order="company_id",
+                limit=1,
+            )
+        )
+        if not sequence:
+            return [False] * count
+        if sequence.use_date_range:
+            return [
+                self.env["ir.sequence"].next_by_code("hic.reference.level")
+                for _index in range(count)
+            ]
+        increment = sequence.number_increment
+        if sequence.implementation == "standard":
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ["ir_sequence_%03d" % sequence.id, count],
+            )
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            self.env.cr.execute(
+                """
+                UPDATE ir_sequence
+                   SET number_next = number_next + %(step)s
+                 WHERE id = %(id)s
+             RETURNING number_next - %(step)s
+                """,
+                {"id": sequence.id, "step": increment * count},
+            )
+            first = self.env.cr.fetchone()[0]
+            numbers = range(first, first + increment * count, increment)
+            sequence.invalidate_recordset(["number_next"])
+        return [sequence.get_next_char(number) for number in numbers]
 
+    @instrument
     def write(self, vals):
         vals["check_edit"] = (
             True
@@ -107,7 +166,9 @@ class ReferenceLevel(models.Model):
             and date.today() >= datetime.strptime(vals["start_date"], "%Y-%m-%d").date()
             else False
         )
-        return super().write(vals)
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
 
     def unlink(self):
         for record in self:
@@ -118,4 +179,45 @@ class ReferenceLevel(models.Model):
                         "the start date is in the past. Cannot be deleted."
                     )
                 )
-        return super().unlink()
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+
+    @tools.ormcache()
+    def _get_level_intervals(self):
+        """Sorted ``(starts, levels)`` interval cache of all reference levels"""
+        self.flush_model(["start_date", "end_date", "level_number"])
+        self.env.cr.execute(
+            """
+            SELECT id, start_date, end_date, level_number
+              FROM hic_reference_level
+             WHERE start_date IS NOT NULL AND end_date IS NOT NULL
+          ORDER BY start_date
+            """
+        )
+        rows = self.env.cr.fetchall()
+        starts = tuple(row[1] for row in rows)
+        levels = tuple((row[0], row[2], row[3]) for row in rows)
+        return starts, levels
+
+    @api.model
+    def get_level_for_dates(self, dates):
+        """Find the reference level active on each of the given dates
+
+        :param dates: iterable of dates (or date strings)
+        :return: list aligned with ``dates`` of ``(reference_level_id,
+            level_number)`` tuples, ``(False, False)`` when no level applies
+        """
+        starts, levels = self._get_level_intervals()
+        result = []
+        for value in dates:
+            match = (False, False)
+            value = fields.Date.to_date(value)
+            if value:
+                pos = bisect_right(starts, value) - 1
+                if pos >= 0:
+                    level_id, end_date, level_number = levels[pos]
+                    if value <= end_date:
+                        match = (level_id, level_number)
+            result.append(match)
+        return result
@@ -1,14 +1,283 @@
-from odoo import models, fields, api
-from datetime import datetime
+import hashlib
+import json
+import logging
+from functools import partial
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import SQL
+
+from .his_source import HIS_SOURCES, fetch_concurrently
+from .instrumentation import instrument
+
+_logger = logging.getLogger(__name__)
+
 
 class SyncMixin(models.AbstractModel):
     """Mixin cho danh mục đồng bộ từ HIS"""
     _name = 'hic.sync.mixin'
     _description = 'HIC Sync Mixin'
-    
+
+    # Tên nguồn dữ liệu HIS (departments, beds, staff...)
+    _his_source_name = None
+    # Trường dùng làm khóa upsert
+    _his_sync_key = 'his_ref'
+    # Ánh xạ khóa bản ghi HIS -> trường Odoo
+    _his_field_map = {}
+
     his_ref = fields.Char('HIS Reference', help='ID/Code trong HIS system')
-    
+    his_sync_hash = fields.Char(
+        'HIS Content Hash', copy=False, readonly=True,
+        help='Hash nội dung bản ghi HIS ở lần đồng bộ gần nhất',
+    )
+    his_modified = fields.Char(
+        'HIS Last Modified', copy=False, readonly=True,
+        help='Mốc thay đổi (watermark) của bản ghi trong HIS',
+    )
+
+    @api.model
+    def _his_sync_domain(self):
+        """Phạm vi bản ghi được đồng bộ (vd. chỉ giường HIS)"""
+        return []
+
+    @api.model
+    def _his_archive_domain(self):
+        """Phạm vi bản ghi có thể bị lưu trữ khi không còn trong nguồn HIS"""
+        return self._his_sync_domain()
+
+    @api.model
+    def _get_his_source(self):
+        """Adapter nguồn HIS theo tham số hệ thống ``hic.his_source``"""
+        kind = self.env['ir.config_parameter'].sudo().get_param('hic.his_source', 'json')
+        if kind not in HIS_SOURCES:
+            raise UserError(_("Unknown HIS source '%s'.", kind))
+        return HIS_SOURCES[kind](self.env)
+
+    @api.model
+    def _his_prepare_vals(self, rows):
+        """Chuyển một lô bản ghi HIS thành danh sách vals"""
+        return [
+            {field: row[key] for key, field in self._his_field_map.items() if key in row}
+            for row in rows
+        ]
+
+    @api.model
+    def _his_department_ids(self, rows):
+        """Ánh xạ mã khoa HIS (``department_code``) của một lô sang id khoa"""
+        codes = {row['department_code'] for row in rows if row.get('department_code')}
+        if not codes:
+            return {}
+        Department = self.env['hr.department'].with_context(active_test=False)
+        departments = Department.search_fetch([('his_code', 'in', list(codes))], ['his_code'])
+        return {department.his_code: department.id for department in departments}
+
+    @api.model
+    def _his_watermark_param(self):
+        return 'hic.his_sync_watermark.%s' % self._name
+
+    @api.model
+    def _his_source_key(self):
+        """Khóa trong bản ghi HIS tương ứng với ``_his_sync_key``"""
+        for key, fname in self._his_field_map.items():
+            if fname == self._his_sync_key:
+                return key
+        return self._his_sync_key
+
+    @api.model
+    @instrument
+    def action_sync_from_his(self, chunk_size=1000, auto_commit=False, delta=False,
+                             full_key_scan=False):
+        """Đồng bộ theo lô từ HIS, upsert theo khóa ``_his_sync_key``
+
+        :param chunk_size: số bản ghi HIS xử lý mỗi lô
+        :param auto_commit: commit sau mỗi lô để không giữ transaction quá lâu
+        :param delta: chỉ lấy bản ghi thay đổi sau watermark của lần đồng bộ
+            thành công gần nhất; bản ghi bị xóa được nhận biết qua ``deleted``
+        :param full_key_scan: ở chế độ delta, tải thêm toàn bộ khóa của nguồn
+            để lưu trữ cả các bản ghi bị xóa mà không có ``deleted`` (tốn kém,
+            chỉ nên chạy thưa, vd. hằng ngày)
+        :return: dict đếm số bản ghi ``created``, ``updated``, ``unchanged``,
+            ``archived``
+        """
+        return self.sync_his_catalogs(
+            [self._name], chunk_size=chunk_size, auto_commit=auto_commit,
+            delta=delta, max_workers=1, full_key_scan=full_key_scan,
+        )[self._name]
+
+    @api.model
+    @instrument
+    def sync_his_catalogs(self, model_names=None, chunk_size=1000, auto_commit=False,
+                          delta=False, max_workers=None, full_key_scan=False):
+        """Đồng bộ nhiều danh mục HIS, tải dữ liệu các nguồn đồng thời
+
+        Mỗi nguồn được tải trong một luồng riêng (tối đa ``max_workers`` kết
+        nối cùng lúc), còn việc ghi dữ liệu chỉ diễn ra trên cursor hiện tại.
+
+        :param model_names: các model kế thừa ``hic.sync.mixin`` cần đồng bộ,
+            mặc định là tất cả
+        :param max_workers: số nguồn tải đồng thời, mặc định theo tham số
+            hệ thống ``hic.his_sync_workers``
+        :param full_key_scan: xem ``action_sync_from_his``
+        :return: dict ``{model: stats}`` như ``action_sync_from_his``
+        """
+        if model_names is None:
+            model_names = sorted(
+                name for name in self.env.registry.descendants([self._name], '_inherit')
+                if not self.env[name]._abstract and self.env[name]._his_source_name
+            )
+        ICP = self.env['ir.config_parameter'].sudo()
+        if not max_workers:
+            max_workers = int(ICP.get_param('hic.his_sync_workers', 4))
+        source = self._get_his_source()
+        jobs = {}
+        states = {}
+        for model_name in model_names:
+            model = self.env[model_name]
+            if not model._his_source_name:
+                raise NotImplementedError(
+                    "Phải khai báo _his_source_name hoặc override action_sync_from_his"
+                )
+            since = (ICP.get_param(model._his_watermark_param()) or None) if delta else None
+            states[model_name] = {
+                'watermark': since or '',
+                # Lần đồng bộ toàn bộ đã có đủ khóa nguồn, không cần tải lại
+                'keys': None if delta else set(),
+                'stats': {'created': 0, 'updated': 0, 'unchanged': 0, 'archived': 0},
+            }
+            jobs[model_name] = partial(source.fetch, model._his_source_name, since=since)
+
+        for model_name, chunk in fetch_concurrently(
+            jobs, max_workers=max_workers, chunk_size=chunk_size,
+        ):
+            model = self.env[model_name]
+            state = states[model_name]
+            state['watermark'] = max(
+                [state['watermark']] + [row.get('modified') or '' for row in chunk]
+            )
+            if state['keys'] is not None:
+                source_key = model._his_source_key()
+                state['keys'].update(
+                    row.get(source_key) for row in chunk if not row.get('deleted')
+                )
+            model._his_upsert_chunk(chunk, state['stats'])
+            self._his_commit_chunk(auto_commit)
+
+        for model_name, state in states.items():
+            model = self.env[model_name]
+            keys = state['keys']
+            if keys is None and full_key_scan:
+                keys = source.fetch_keys(model._his_source_name, model._his_source_key())
+            if keys is not None:
+                state['stats']['archived'] += model._his_archive_missing(keys)
+                self._his_commit_chunk(auto_commit)
+            # Chỉ lưu watermark khi toàn bộ lần đồng bộ thành công
+            if state['watermark']:
+                ICP.set_param(model._his_watermark_param(), state['watermark'])
+            _logger.info("HIS sync %s: %s", model_name, state['stats'])
+        return {model_name: state['stats'] for model_name, state in states.items()}
+
+    @api.model
+    def _his_commit_chunk(self, auto_commit):
+        self.env.flush_all()
+        if auto_commit:
+            self.env.cr.commit()
+        # Giải phóng cache ORM để bộ nhớ không tăng theo số lô
+        self.env.invalidate_all()
+
+    @api.model
+    def _his_row_hash(self, row):
+        """Hash nội dung ổn định của một bản ghi HIS (bỏ qua watermark)"""
+        content = {key: value for key, value in row.items() if key != 'modified'}
+        payload = json.dumps(content, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    @api.model
+    @instrument
+    def _his_upsert_chunk(self, rows, stats):
+        """Upsert một lô: một truy vấn đọc, một create và write theo nhóm"""
+        key = self._his_sync_key
+        has_active = 'active' in self._fields
+        deleted_keys = set()
+        live_rows = []
+        for row in rows:
+            if row.get('deleted'):
+                deleted_keys.add(row.get(self._his_source_key()))
+            else:
+                live_rows.append(row)
+        if deleted_keys and has_active:
+            stats['archived'] += self._his_archive(
+                [(key, 'in', list(deleted_keys)), ('active', '=', True)]
+            )
+        vals_by_key = {}
+        for row, vals in zip(live_rows, self._his_prepare_vals(live_rows)):
+            if vals.get(key):
+                vals['his_sync_hash'] = self._his_row_hash(row)
+                vals['his_modified'] = row.get('modified') or False
+                if has_active:
+                    # Bản ghi xuất hiện lại trong nguồn được kích hoạt lại
+                    vals['active'] = True
+                vals_by_key[vals[key]] = vals
+        if not vals_by_key:
+            return
+        fnames = sorted({fname for vals in vals_by_key.values() for fname in vals})
+        existing = self.with_context(active_test=False).search_fetch(
+            self._his_sync_domain() + [(key, 'in', list(vals_by_key))], fnames,
+        )
+        # Gom các bản ghi có cùng thay đổi để ghi một lần
+        groups = {}
+        for record in existing:
+            vals = vals_by_key.pop(record[key], None)
+            if vals is None:
+                continue
+            if record.his_sync_hash == vals['his_sync_hash'] and (
+                not has_active or record.active
+            ):
+                stats['unchanged'] += 1
+                continue
+            changes = {
+                fname: value for fname, value in vals.items()
+                if self._his_is_changed(record, fname, value)
+            }
+            signature = tuple(sorted(changes.items()))
+            groups.setdefault(signature, []).append(record.id)
+        for signature, record_ids in groups.items():
+            self.browse(record_ids).write(dict(signature))
+            stats['updated'] += len(record_ids)
+        if vals_by_key:
+            self.create(list(vals_by_key.values()))
+            stats['created'] += len(vals_by_key)
+
+    @api.model
+    def _his_archive_missing(self, source_keys):
+        """Lưu trữ các bản ghi đang hoạt động không còn trong nguồn HIS"""
+        if 'active' not in self._fields:
+            return 0
+        keys = {key for key in source_keys if key}
+        key = self._his_sync_key
+        query = self._search(self._his_archive_domain() + [('active', '=', True)])
+        self.env.cr.execute(query.select(SQL.identifier(self._table, key)))
+        missing = [value for value, in self.env.cr.fetchall() if value not in keys]
+        if not missing:
+            return 0
+        if not keys:
+            # Nguồn trả về rỗng thường do lỗi cấu hình/kết nối, không phải do
+            # HIS đã xóa toàn bộ danh mục
+            raise UserError(_(
+                "HIS source '%(source)s' returned no records, refusing to archive "
+                "%(count)s active records of %(model)s.",
+                source=self._his_source_name, count=len(missing), model=self._name,
+            ))
+        return self._his_archive([(key, 'in', missing)])
+
+    @api.model
+    def _his_archive(self, domain):
+        records = self.search(self._his_archive_domain() + domain)
+        records.write({'active': False})
+        return len(records)
+
     @api.model
-    def action_sync_from_his(self):
-        """Template method - Override trong từng model"""
-        raise NotImplementedError("Phải implement method action_sync_from_his")
\ No newline at end of file
+    def _his_is_changed(self, record, fname, value):
+        field = self._fields[fname]
+        return field.convert_to_cache(value, record) != field.convert_to_cache(
+            record[fname], record
+        )
@@ -0,0 +1,3 @@
+from . import test_benchmark
+from . import test_claim_xml
+from . import test_his_source
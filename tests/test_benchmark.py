@@ -0,0 +1,323 @@
+"""Benchmark các đường nóng của danh mục HIC ở quy mô production
+
+Không chạy cùng bộ test mặc định, chạy riêng bằng::
+
+    odoo-bin -d <db> -i <module> --test-tags hic_benchmark --stop-after-init
+
+Biến môi trường:
+
+* ``HIC_BENCHMARK_SCALES``: các quy mô cần đo, mặc định ``1000,10000,100000``
+* ``HIC_BENCHMARK_OUTPUT``: file JSON kết quả, mặc định
+  ``<data_dir>/hic_benchmark/<module>-<version>-<thời điểm>.json``
+
+Dữ liệu được bổ sung dần giữa các quy mô (1k → 10k → 100k) và bị rollback khi
+kết thúc mỗi test. Mỗi kết quả gồm thời gian (giây) và số câu SQL đã chạy.
+"""
+
+import json
+import logging
+import os
+import platform
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from itertools import product
+
+from odoo.tests import TransactionCase, tagged
+from odoo.tools import config, split_every
+
+_logger = logging.getLogger(__name__)
+
+MODULE = __name__.split(".")[2]
+SCALES = tuple(
+    int(scale)
+    for scale in os.environ.get("HIC_BENCHMARK_SCALES", "1000,10000,100000").split(",")
+    if scale.strip()
+)
+BATCH_SIZE = 1000
+# Số lần gọi cho các thao tác nhanh (name_search, wizard) ở mỗi quy mô
+REPEAT = 20
+# Bậc tham chiếu thực tế chỉ có vài chục bản ghi, mỗi bản ghi được kiểm tra
+# chồng lấn bằng một truy vấn riêng nên giới hạn quy mô để bộ benchmark
+# không kéo dài hàng giờ
+MAX_REFERENCE_LEVELS = 10000
+# Mã đối tượng KCB (có quy tắc định dạng) dài tối đa 4 ký tự gồm số và ký tự
+# đặc biệt. Mã benchmark luôn chứa ngoặc/gạch để không trùng mã thật (chỉ gồm
+# số và dấu chấm), nên chỉ có khoảng 69k mã
+KCB_CODE_CHARS = "0123456789.-_()[]"
+KCB_REAL_CODE_CHARS = set("0123456789.")
+# Ngoài mọi khoảng thời gian thực tế để không lẫn với dữ liệu có sẵn
+BASE_DATE = date(3000, 1, 1)
+
+
+@tagged("-standard", "-at_install", "post_install", "hic_benchmark")
+class TestCatalogBenchmark(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+        cls.env = cls.env(
+            context=dict(
+                cls.env.context,
+                tracking_disable=True,
+                mail_create_nolog=True,
+                mail_notrack=True,
+            )
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._write_results()
+        super().tearDownClass()
+
+    @classmethod
+    def _write_results(cls):
+        if not cls.results:
+            return
+        module = cls.env["ir.module.module"].search([("name", "=", MODULE)])
+        started = datetime.utcnow()
+        path = os.environ.get("HIC_BENCHMARK_OUTPUT") or os.path.join(
+            config["data_dir"],
+            "hic_benchmark",
+            f"{MODULE}-{module.latest_version or 'dev'}-"
+            f"{started:%Y%m%dT%H%M%S}.json",
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        cls.env.cr.execute("SHOW server_version")
+        report = {
+            "module": MODULE,
+            "version": module.latest_version,
+            "date": started.isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "postgresql": cls.env.cr.fetchone()[0],
+            "scales": list(SCALES),
+            "results": cls.results,
+        }
+        with open(path, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+        _logger.info("HIC benchmark results written to %s", path)
+
+    @contextmanager
+    def measure(self, benchmark, scale, calls=1):
+        """Đo thời gian và số câu SQL của khối lệnh, kể cả phần flush"""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        yield
+        self.env.flush_all()
+        elapsed = time.perf_counter() - start
+        result = {
+            "benchmark": benchmark,
+            "rows": scale,
+            "calls": calls,
+            "seconds": round(elapsed, 6),
+            "seconds_per_call": round(elapsed / calls, 6),
+            "queries": self.env.cr.sql_log_count - queries,
+        }
+        self.results.append(result)
+        _logger.info(
+            "%s @%s: %.3fs, %s queries",
+            benchmark,
+            scale,
+            elapsed,
+            result["queries"],
+        )
+
+    def _populate(self, model_name, scale, make_vals, domain):
+        """Bổ sung bản ghi cho đủ ``scale`` bản ghi khớp ``domain``"""
+        Model = self.env[model_name]
+        existing = Model.with_context(active_test=False).search_count(domain)
+        for indexes in split_every(BATCH_SIZE, range(existing, scale)):
+            Model.create([make_vals(index) for index in indexes])
+        return Model.search(domain, limit=scale, order="id")
+
+    # ------------------------------------------------------------------
+    # Dữ liệu
+    # ------------------------------------------------------------------
+
+    def _populate_facilities(self, scale):
+        return self._populate(
+            "hic.medical.facility",
+            scale,
+            lambda index: {
+                "code": f"BM{index:06d}",
+                "name": f"Bệnh viện đa khoa benchmark {index}",
+            },
+            [("code", "=like", "BM%")],
+        )
+
+    def _populate_technical_levels(self, scale):
+        return self._populate(
+            "hic.category",
+            scale,
+            lambda index: {
+                "category_type": "technical_level",
+                "code": f"BM{index:06d}",
+                "name": f"Cấp chuyên môn kỹ thuật {index}",
+            },
+            [("category_type", "=", "technical_level"), ("code", "=like", "BM%")],
+        )
+
+    def _kcb_object_codes(self):
+        return [
+            "".join(chars)
+            for chars in product(KCB_CODE_CHARS, repeat=4)
+            if not KCB_REAL_CODE_CHARS.issuperset(chars)
+        ]
+
+    def _populate_kcb_object_codes(self, codes):
+        return self._populate(
+            "hic.category",
+            len(codes),
+            lambda index: {
+                "category_type": "kcb_object_code",
+                "code": codes[index],
+                "name": f"Đối tượng KCB benchmark {index}",
+            },
+            [("category_type", "=", "kcb_object_code"), ("code", "in", codes)],
+        )
+
+    def _populate_departments(self, scale):
+        return self._populate(
+            "hr.department",
+            scale,
+            lambda index: {
+                "name": f"Khoa benchmark {index}",
+                "bhyt_code": f"BM{index:06d}",
+                "bhyt_name": f"Khoa benchmark {index}",
+                "department_source": "bhyt",
+            },
+            [("department_source", "=", "bhyt"), ("bhyt_code", "=like", "BM%")],
+        )
+
+    def _populate_payment_rates(self, scale):
+        # Mỗi cặp (cơ sở, cấp) có 10 giai đoạn một năm liên tiếp
+        pairs = max(scale // 10, 1)
+        facilities = self._populate_facilities(min(pairs, 1000))
+        levels = self._populate_technical_levels(-(-pairs // len(facilities)))
+
+        def make_vals(index):
+            pair, period = divmod(index, 10)
+            level, facility = divmod(pair, len(facilities))
+            date_from = date(2000 + period, 1, 1)
+            return {
+                "code": f"BM{index:07d}",
+                "medical_facility_id": facilities[facility].id,
+                "technical_level_id": levels[level].id,
+                "outpatient_rate": 40.0,
+                "inpatient_rate": 60.0,
+                "date_from": date_from,
+                "date_to": date_from.replace(month=12, day=31),
+            }
+
+        return self._populate(
+            "hic.payment.rate", scale, make_vals, [("code", "=like", "BM%")]
+        )
+
+    def _populate_reference_levels(self, scale):
+        # Giai đoạn hai ngày, cách nhau một ngày, không chồng lấn
+        return self._populate(
+            "hic.reference.level",
+            scale,
+            lambda index: {
+                "level_number": index % 5 + 1,
+                "start_date": BASE_DATE + timedelta(days=3 * index),
+                "end_date": BASE_DATE + timedelta(days=3 * index + 1),
+            },
+            [("start_date", ">=", BASE_DATE)],
+        )
+
+    def _search_terms(self, scale):
+        """Các chuỗi tìm kiếm (mã và tên) trải đều trên dữ liệu của quy mô"""
+        step = max(scale // REPEAT, 1)
+        return [
+            f"BM{index:06d}" if position % 2 else f"benchmark {index}"
+            for position, index in enumerate(range(0, scale, step))
+        ][:REPEAT]
+
+    # ------------------------------------------------------------------
+    # Benchmark
+    # ------------------------------------------------------------------
+
+    def test_category_create(self):
+        Category = self.env["hic.category"]
+        for scale in SCALES:
+            vals_list = [
+                {
+                    "category_type": "technical_level",
+                    "code": f"BC{scale:06d}{index:06d}",
+                    "name": f"Benchmark {index}",
+                }
+                for index in range(scale)
+            ]
+            with self.measure("hic.category.create", scale):
+                for batch in split_every(BATCH_SIZE, vals_list):
+                    Category.create(list(batch))
+
+    def test_category_validation(self):
+        Category = self.env["hic.category"]
+        for scale in SCALES:
+            codes = [str(index % 10000) for index in range(scale)]
+            with self.measure("hic.category.validate_codes", scale):
+                Category.validate_codes("kcb_object_code", codes)
+        # Trên loại mã có quy tắc để đo cả phần kiểm tra định dạng
+        kcb_codes = self._kcb_object_codes()
+        for scale in sorted({min(scale, len(kcb_codes)) for scale in SCALES}):
+            categories = self._populate_kcb_object_codes(kcb_codes[:scale])
+            with self.measure("hic.category._check_category_code", scale):
+                categories._check_category_code()
+
+    def test_payment_rate_overlap(self):
+        # Ràng buộc EXCLUDE được kiểm tra khi cột của khoảng thời gian thay đổi,
+        # lùi ngày kết thúc một ngày để không tạo chồng lấn
+        for scale in SCALES:
+            rates = self._populate_payment_rates(scale)
+            groups = rates.grouped("date_to")
+            with self.measure("hic.payment.rate.period_no_overlap", scale):
+                for date_to, group in groups.items():
+                    group.write({"date_to": date_to - timedelta(days=1)})
+
+    def test_reference_level_overlap(self):
+        for scale in sorted({min(scale, MAX_REFERENCE_LEVELS) for scale in SCALES}):
+            levels = self._populate_reference_levels(scale)
+            with self.measure(
+                "hic.reference.level._check_overlapping_dates", scale
+            ):
+                levels._check_overlapping_dates()
+
+    def test_name_search(self):
+        populate = {
+            "hic.medical.facility": self._populate_facilities,
+            "hic.category": self._populate_technical_levels,
+            "hic.payment.rate": self._populate_payment_rates,
+            "hr.department": self._populate_departments,
+        }
+        for scale in SCALES:
+            terms = self._search_terms(scale)
+            for model_name, populate_model in populate.items():
+                populate_model(scale)
+                Model = self.env[model_name]
+                with self.measure(f"{model_name}.name_search", scale, len(terms)):
+                    for term in terms:
+                        Model.name_search(term, limit=8)
+
+    def test_department_wizard(self):
+        Wizard = self.env["hic.department.wizard"]
+        his_departments = self.env["hr.department"].create(
+            [
+                {"name": f"Khoa HIS benchmark {index}", "department_source": "his"}
+                for index in range(3)
+            ]
+        )
+        for run, scale in enumerate(SCALES):
+            self._populate_departments(scale)
+            with self.measure("hic.department.wizard", scale, REPEAT):
+                for index in range(REPEAT):
+                    Wizard.create(
+                        {
+                            "bhyt_code": f"BW{run:03d}{index:03d}",
+                            "bhyt_name": f"Khoa mới {index}",
+                            "his_department_ids": [(6, 0, his_departments.ids)],
+                        }
+                    ).action_create_department()
@@ -0,0 +1,120 @@
+import base64
+import os
+import tempfile
+from io import BytesIO
+
+from odoo.tests import TransactionCase, tagged
+
+XML1 = """<TONG_HOP>
+    <MA_LK>LK0001</MA_LK>
+    <MA_CSKCB>TCX01</MA_CSKCB>
+    <MA_KHOA>TCXZZ</MA_KHOA>
+</TONG_HOP>"""
+
+XML4 = """<CHITIEU_CHITIET_DICHVUCANLAMSANG>
+    <DSACH_CHI_TIET_CLS>
+        <CHI_TIET_CLS>
+            <MA_LK>LK0001</MA_LK>
+            <MA_DICH_VU>22.0120.1369</MA_DICH_VU>
+            <MA_CHI_SO>HGB</MA_CHI_SO>
+            <GIA_TRI>135</GIA_TRI>
+        </CHI_TIET_CLS>
+    </DSACH_CHI_TIET_CLS>
+</CHITIEU_CHITIET_DICHVUCANLAMSANG>"""
+
+# Cùng một hồ sơ theo hai chuẩn, các mã đều không có trong danh mục
+XML1_4210 = """<TONG_HOP>
+    <MA_LK>LK4210</MA_LK>
+    <MA_THE>ZZ9797979797979</MA_THE>
+    <MA_LYDO_VVIEN>97.9</MA_LYDO_VVIEN>
+    <TINH_TRANG_RV>97</TINH_TRANG_RV>
+    <MA_CSKCB>TCX01</MA_CSKCB>
+</TONG_HOP>"""
+
+XML1_130 = """<TONG_HOP>
+    <MA_LK>LK0130</MA_LK>
+    <MA_THE_BHYT>ZZ9797979797979</MA_THE_BHYT>
+    <MA_DOITUONG_KCB>97.9</MA_DOITUONG_KCB>
+    <MA_LOAI_RV>97</MA_LOAI_RV>
+    <MA_CSKCB>TCX01</MA_CSKCB>
+</TONG_HOP>"""
+
+
+def _claim_file(*files):
+    """File giám định một hồ sơ, mỗi FILEHOSO mã hóa base64 như thực tế"""
+    file_elements = "".join(
+        "<FILEHOSO><LOAIHOSO>%s</LOAIHOSO><NOIDUNGFILE>%s</NOIDUNGFILE></FILEHOSO>"
+        % (file_type, base64.b64encode(content.encode()).decode())
+        for file_type, content in files
+    )
+    return BytesIO(
+        (
+            "<GIAMDINHHS><THONGTINHOSO><DANHSACHHOSO><HOSO>%s</HOSO>"
+            "</DANHSACHHOSO></THONGTINHOSO></GIAMDINHHS>" % file_elements
+        ).encode()
+    )
+
+
+@tagged("post_install", "-at_install")
+class TestClaimXml(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env["hic.medical.facility"].create({"code": "TCX01", "name": "CSKCB test"})
+        cls.ClaimXml = cls.env["hic.claim.xml"]
+
+    def test_multi_file_claim(self):
+        result = self.ClaimXml.validate_claim_file(
+            _claim_file(("XML1", XML1), ("XML4", XML4))
+        )
+        self.assertEqual(result["claims"], 1)
+        self.assertEqual(result["invalid"], 1)
+        [report] = result["reports"]
+        self.assertEqual(report["ma_lk"], "LK0001")
+        self.assertEqual(
+            [
+                (error["file"], error["field"], error["code"])
+                for error in report["errors"]
+            ],
+            [("XML1", "MA_KHOA", "TCXZZ")],
+        )
+
+    def _error_fields(self, content):
+        [report] = self.ClaimXml.validate_claim_file(
+            _claim_file(("XML1", content))
+        )["reports"]
+        return sorted(error["field"] for error in report["errors"])
+
+    def test_claim_4210(self):
+        self.assertEqual(
+            self._error_fields(XML1_4210),
+            ["MA_LYDO_VVIEN", "MA_THE", "TINH_TRANG_RV"],
+        )
+
+    def test_claim_130(self):
+        self.assertEqual(
+            self._error_fields(XML1_130),
+            ["MA_DOITUONG_KCB", "MA_LOAI_RV", "MA_THE_BHYT"],
+        )
+
+    def test_invalid_file_content(self):
+        result = self.ClaimXml.validate_claim_file(
+            _claim_file(("XML1", XML1), ("XML4", "<CHITIEU"))
+        )
+        [report] = result["reports"]
+        self.assertIn(
+            ("XML4", "NOIDUNGFILE"),
+            [(error["file"], error["field"]) for error in report["errors"]],
+        )
+
+    def test_external_entities_not_resolved(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+            file.write("TCXSECRET")
+        self.addCleanup(os.unlink, file.name)
+        content = (
+            '<!DOCTYPE TONG_HOP [<!ENTITY secret SYSTEM "file://%s">]>'
+            "<TONG_HOP><MA_LK>LK0002</MA_LK><MA_KHOA>&secret;</MA_KHOA></TONG_HOP>"
+            % file.name
+        )
+        result = self.ClaimXml.validate_claim_file(_claim_file(("XML1", content)))
+        self.assertNotIn("TCXSECRET", str(result))
@@ -0,0 +1,143 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from odoo.tests import TransactionCase, tagged
+
+from ..models.his_source import HttpHisSource
+
+
+class FakeHisHandler(BaseHTTPRequestHandler):
+    """API HIS giả lập: ``GET /<source>?page=&page_size=`` trả về mảng JSON"""
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        source = url.path.strip("/")
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        with server.lock:
+            server.requests.append((source, params))
+            failures = server.failures.get(source)
+            status = failures.pop(0) if failures else 200
+        if status != 200:
+            self.send_response(status)
+            self.end_headers()
+            return
+        page = int(params["page"])
+        page_size = int(params["page_size"])
+        rows = server.data.get(source, [])[(page - 1) * page_size : page * page_size]
+        body = json.dumps(rows).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@tagged("post_install", "-at_install")
+class TestHttpHisSource(TransactionCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), FakeHisHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.data = {
+            "departments": [
+                {"code": f"TK{index:02d}", "name": f"Khoa test {index}"}
+                for index in range(5)
+            ],
+            "beds": [
+                {"code": f"TG{index:02d}", "name": f"Giường test {index}"}
+                for index in range(3)
+            ],
+        }
+        thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        thread.start()
+        cls.addClassCleanup(thread.join)
+        cls.addClassCleanup(cls.server.server_close)
+        cls.addClassCleanup(cls.server.shutdown)
+        cls.url = "http://127.0.0.1:%s" % cls.server.server_address[1]
+        ICP = cls.env["ir.config_parameter"].sudo()
+        ICP.set_param("hic.his_source", "http")
+        ICP.set_param("hic.his_source_url", cls.url)
+        ICP.set_param("hic.his_source_page_size", 2)
+        ICP.set_param("hic.his_source_backoff", 0)
+
+    def setUp(self):
+        super().setUp()
+        self.server.requests = []
+        self.server.failures = {}
+
+    def _source(self, **kwargs):
+        return HttpHisSource(self.env, url=self.url, page_size=2, backoff=0, **kwargs)
+
+    def test_paging(self):
+        rows = list(self._source().fetch("departments"))
+        self.assertEqual(
+            [row["code"] for row in rows], [f"TK{index:02d}" for index in range(5)]
+        )
+        # 2 + 2 + 1 bản ghi, trang cuối ít hơn page_size
+        self.assertEqual(
+            [params["page"] for _source, params in self.server.requests],
+            ["1", "2", "3"],
+        )
+
+    def test_paging_since(self):
+        list(self._source().fetch("departments", since="2024-01-01"))
+        self.assertEqual(self.server.requests[0][1]["since"], "2024-01-01")
+
+    def test_retry_on_server_errors(self):
+        self.server.failures = {"beds": [500, 429, 503]}
+        rows = list(self._source(max_retries=3).fetch("beds"))
+        self.assertEqual(len(rows), 3)
+        # 3 lần lỗi được thử lại trên trang đầu, sau đó 2 trang thành công
+        self.assertEqual(len(self.server.requests), 5)
+
+    def test_retry_exhausted(self):
+        self.server.failures = {"beds": [500, 500, 500]}
+        with self.assertRaises(requests.HTTPError):
+            list(self._source(max_retries=2).fetch("beds"))
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_client_error_not_retried(self):
+        self.server.failures = {"beds": [404]}
+        with self.assertRaises(requests.HTTPError):
+            list(self._source(max_retries=3).fetch("beds"))
+        self.assertEqual(len(self.server.requests), 1)
+
+    def _sync(self):
+        # Chế độ delta: không lưu trữ dữ liệu sẵn có không nằm trong nguồn giả lập
+        return self.env["hic.sync.mixin"].sync_his_catalogs(
+            ["hr.department", "hic.hospital.bed"],
+            chunk_size=2,
+            max_workers=2,
+            delta=True,
+        )
+
+    def test_concurrent_sync(self):
+        self.server.failures = {"departments": [502], "beds": [429]}
+        result = self._sync()
+        self.assertEqual(result["hr.department"]["created"], 5)
+        self.assertEqual(result["hic.hospital.bed"]["created"], 3)
+        self.assertEqual(
+            {source for source, _params in self.server.requests},
+            {"departments", "beds"},
+        )
+        departments = self.env["hr.department"].search(
+            [("his_code", "=like", "TK%")]
+        )
+        self.assertEqual(len(departments), 5)
+        self.assertEqual(set(departments.mapped("department_source")), {"his"})
+        beds = self.env["hic.hospital.bed"].search([("code", "=like", "TG%")])
+        self.assertEqual(set(beds.mapped("bed_type")), {"his"})
+
+        # Lần chạy lại với cùng dữ liệu không ghi gì
+        result = self._sync()
+        self.assertEqual(result["hr.department"]["unchanged"], 5)
+        self.assertEqual(result["hic.hospital.bed"]["unchanged"], 3)
@@ -1 +1,2 @@
 from . import department_wizard
+from . import catalog_import_wizard
@@ -0,0 +1,251 @@
+import base64
+import csv
+import io
+from itertools import islice
+
+from psycopg2 import IntegrityError
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError, ValidationError
+from odoo.tools import split_every
+
+from ..models.instrumentation import instrument
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+CATEGORY_TYPES = [
+    ('technical_level', 'Cấp độ chuyên môn kỹ thuật'),
+    ('professional_title', 'Chức danh nghề nghiệp'),
+    ('medical_service_code', 'Mã loại KCB'),
+    ('bhyt_object_code', 'Mã đối tượng BHYT'),
+    ('kcb_object_code', 'Mã đối tượng KCB'),
+    ('discharge_type_code', 'Mã loại ra viện'),
+    ('accident_code', 'Mã tai nạn'),
+]
+
+
+class CatalogImportWizard(models.TransientModel):
+    """Wizard nhập danh mục từ file Excel/CSV của Bộ Y tế theo lô"""
+    _name = 'hic.catalog.import.wizard'
+    _description = 'Import Official Catalog Wizard'
+
+    catalog_type = fields.Selection(
+        CATEGORY_TYPES + [('medical_facility', 'Cơ sở KCB')],
+        string='Loại danh mục',
+        required=True,
+    )
+    file = fields.Binary('File', required=True, attachment=True)
+    filename = fields.Char('Tên file')
+    chunk_size = fields.Integer('Số dòng mỗi lô', default=1000)
+    state = fields.Selection([
+        ('draft', 'Mới'),
+        ('failed', 'Bị gián đoạn'),
+        ('done', 'Hoàn thành'),
+    ], default='draft', readonly=True)
+    rows_done = fields.Integer('Số dòng đã xử lý', readonly=True)
+    rows_total = fields.Integer('Tổng số dòng', readonly=True)
+    progress = fields.Float('Tiến độ (%)', compute='_compute_progress')
+    created_count = fields.Integer('Đã tạo', readonly=True)
+    updated_count = fields.Integer('Đã cập nhật', readonly=True)
+    error_count = fields.Integer('Dòng lỗi', readonly=True)
+    error_log = fields.Text('Chi tiết lỗi', readonly=True)
+
+    @api.depends('rows_done', 'rows_total')
+    def _compute_progress(self):
+        for wizard in self:
+            wizard.progress = (
+                100.0 * wizard.rows_done / wizard.rows_total
+                if wizard.rows_total else 0.0
+            )
+
+    @instrument
+    def action_import(self):
+        """Nhập file theo lô, lưu tiến độ sau mỗi lô để có thể tiếp tục"""
+        self.ensure_one()
+        if self.state == 'done':
+            raise UserError(_("Danh mục đã được nhập xong."))
+        chunk_size = max(self.chunk_size, 1)
+        rows, total = self._read_rows()
+        if total:
+            self.rows_total = total
+        # Bỏ qua các dòng đã nhập ở lần chạy trước
+        for chunk in split_every(chunk_size, islice(rows, self.rows_done, None)):
+            try:
+                self._import_chunk(chunk, self.rows_done)
+            except Exception:
+                self.env.cr.rollback()
+                self.state = 'failed'
+                self.env.cr.commit()
+                raise
+            self.rows_done += len(chunk)
+            # Lưu kết quả và tiến độ của lô
+            self.env.cr.commit()
+        self.state = 'done'
+        return {
+            'type': 'ir.actions.act_window',
+            'res_model': self._name,
+            'res_id': self.id,
+            'view_mode': 'form',
+            'target': 'new',
+        }
+
+    def _read_rows(self):
+        """Iterator các dòng (dict) của file và tổng số dòng nếu biết trước"""
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_id', '=', self.id),
+            ('res_field', '=', 'file'),
+        ], limit=1)
+        if attachment.store_fname:
+            stream = open(attachment._full_path(attachment.store_fname), 'rb')
+        else:
+            data = self.with_context(bin_size=False).file
+            stream = io.BytesIO(base64.b64decode(data))
+        if (self.filename or '').lower().endswith('.xlsx'):
+            return self._read_xlsx(stream)
+        return self._read_csv(stream), self._count_csv_rows(stream)
+
+    def _count_csv_rows(self, stream):
+        """Số dòng dữ liệu, đếm ký tự xuống dòng theo khối trước khi đọc
+
+        Là ước lượng khi giá trị có chứa xuống dòng, chỉ dùng cho tiến độ.
+        """
+        lines = 0
+        block = b''
+        for block in iter(lambda: stream.read(1 << 20), b''):
+            lines += block.count(b'\n')
+        if block and not block.endswith(b'\n'):
+            lines += 1
+        stream.seek(0)
+        # Trừ dòng tiêu đề
+        return max(lines - 1, 0)
+
+    def _read_csv(self, stream):
+        with stream:
+            text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+            for row in csv.DictReader(text):
+                yield {
+                    (key or '').strip().lower(): (value or '').strip()
+                    for key, value in row.items()
+                }
+
+    def _read_xlsx(self, stream):
+        if openpyxl is None:
+            raise UserError(_("Cần cài đặt thư viện openpyxl để đọc file Excel."))
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+        sheet = workbook.active
+
+        def rows():
+            try:
+                values = sheet.iter_rows(values_only=True)
+                header = [str(cell or '').strip().lower() for cell in next(values, ())]
+                for value_row in values:
+                    yield {
+                        key: str(value).strip() if value is not None else ''
+                        for key, value in zip(header, value_row)
+                    }
+            finally:
+                workbook.close()
+                stream.close()
+
+        return rows(), max((sheet.max_row or 1) - 1, 0)
+
+    @instrument
+    def _import_chunk(self, rows, offset):
+        """Chuẩn hóa, kiểm tra và ghi một lô dòng bằng một lần tạo theo lô"""
+        vals_by_code, errors = self._prepare_chunk(rows, offset)
+        model, domain = self._target_model()
+        # Mã của bản ghi đã lưu trữ có thể trùng với một bản ghi đang hoạt
+        # động: ưu tiên cập nhật bản ghi đang hoạt động
+        order = 'active desc, id' if 'active' in model._fields else 'id'
+        existing = model.with_context(active_test=False).search_fetch(
+            domain + [('code', 'in', list(vals_by_code))], ['code', 'name'],
+            order=order,
+        )
+        to_update = {}
+        for record in existing:
+            entry = vals_by_code.pop(record.code, None)
+            if entry is None:
+                continue
+            vals = entry[1]
+            if record.name != vals['name']:
+                to_update[record] = vals
+        try:
+            with self.env.cr.savepoint():
+                self._write_chunk(model, list(vals_by_code.values()), to_update)
+        except (ValidationError, IntegrityError):
+            # Lô lỗi: ghi từng dòng để tách các dòng không hợp lệ
+            for line, vals in vals_by_code.values():
+                try:
+                    with self.env.cr.savepoint():
+                        self._write_chunk(model, [(line, vals)], {})
+                except (ValidationError, IntegrityError) as error:
+                    errors.append(
+                        _("Dòng %(line)s: %(error)s", line=line, error=error.args[0])
+                    )
+            for record, vals in to_update.items():
+                try:
+                    with self.env.cr.savepoint():
+                        self._write_chunk(model, [], {record: vals})
+                except (ValidationError, IntegrityError) as error:
+                    errors.append(
+                        _("Mã %(code)s: %(error)s", code=record.code, error=error.args[0])
+                    )
+        if errors:
+            self.error_count += len(errors)
+            self.error_log = '\n'.join(filter(None, [self.error_log] + errors))
+
+    def _write_chunk(self, model, new_rows, to_update):
+        if new_rows:
+            model.with_context(tracking_disable=True, mail_create_nolog=True).create(
+                [vals for _line, vals in new_rows]
+            )
+            self.created_count += len(new_rows)
+        for record, vals in to_update.items():
+            record.with_context(tracking_disable=True).write({'name': vals['name']})
+            self.updated_count += 1
+
+    def _prepare_chunk(self, rows, offset):
+        """Chuẩn hóa mã như ``_onchange_code`` và kiểm tra trong một lượt"""
+        Category = self.env['hic.category']
+        is_category = self.catalog_type != 'medical_facility'
+        vals_by_code = {}
+        errors = []
+        # Dòng 1 là tiêu đề
+        for line, row in enumerate(rows, start=offset + 2):
+            code = row.get('code', '')
+            if is_category:
+                code = Category._normalize_code(self.catalog_type, code)
+            name = row.get('name', '')
+            if not code or not name:
+                errors.append(_("Dòng %(line)s: thiếu mã hoặc tên", line=line))
+                continue
+            if code in vals_by_code:
+                errors.append(
+                    _("Dòng %(line)s: mã %(code)s bị trùng trong file", line=line, code=code)
+                )
+                continue
+            vals = {'code': code, 'name': name}
+            if is_category:
+                vals['category_type'] = self.catalog_type
+                if row.get('description'):
+                    vals['description'] = row['description']
+            vals_by_code[code] = (line, vals)
+        if is_category:
+            # Kiểm tra định dạng mã cả lô trước khi ghi vào database
+            for code, message in Category.validate_codes(
+                self.catalog_type, list(vals_by_code)
+            ):
+                line = vals_by_code.pop(code)[0]
+                errors.append(
+                    _("Dòng %(line)s: %(error)s", line=line, error=message)
+                )
+        return vals_by_code, errors
+
+    def _target_model(self):
+        if self.catalog_type == 'medical_facility':
+            return self.env['hic.medical.facility'], []
+        return self.env['hic.category'], [('category_type', '=', self.catalog_type)]
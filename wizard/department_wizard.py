@@ -1,6 +1,8 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
 
+from ..models.instrumentation import instrument
+
 class DepartmentWizard(models.TransientModel):
     """Wizard tạo khoa BHYT mới"""
     _name = 'hic.department.wizard'
@@ -26,6 +28,7 @@ class DepartmentWizard(models.TransientModel):
     description = fields.Text('Ghi chú')
     
     @api.constrains('bhyt_code')
+    @instrument
     def _check_bhyt_code(self):
         """Validate mã BHYT với message clear"""
         for record in self:
@@ -40,6 +43,7 @@ class DepartmentWizard(models.TransientModel):
                           code=record.bhyt_code)
                     )
     
+    @instrument
     def action_create_department(self):
         """Tạo khoa BHYT mới với enhanced notification"""
         self.ensure_one()